@@ -0,0 +1,158 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .tokens import PAGES_CLAIM, PERMISSIONS_CLAIM, ROLE_CLAIM, VERSION_CLAIM, get_user_version
+
+
+class UserCache:
+    """Bounded, thread-safe LRU cache of User instances with a TTL.
+
+    The cache is per worker process. Entries are dropped on User save/delete
+    and on logout within the same process; the TTL bounds how long another
+    worker can keep serving a stale user.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache_settings = getattr(settings, 'AUTH_USER_CACHE', {})
+user_cache = UserCache(
+    max_size=_cache_settings.get('MAX_SIZE', 1024),
+    ttl=_cache_settings.get('TTL', 60),
+)
+
+
+class ClaimsUser(TokenUser):
+    """Stateless user built from access token claims, used on claims-only views"""
+
+    @cached_property
+    def role(self):
+        return self.token[ROLE_CLAIM]
+
+    @cached_property
+    def permissions_digest(self):
+        return self.token.get(PERMISSIONS_CLAIM)
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    @property
+    def is_coordinator(self):
+        return self.role == 'coordinator'
+
+    @property
+    def is_participant(self):
+        return self.role == 'participant'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves users through the per-process user cache.
+
+    Views that set ``claims_authentication = True`` get a ClaimsUser on safe
+    requests instead, so they are authorized without loading the user at all.
+    Tokens whose user version is behind the user's token_version are
+    rejected, which makes the client refresh them.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        if self.accepts_claims_user(request, validated_token):
+            self.check_token_version(validated_token, get_user_version(validated_token[api_settings.USER_ID_CLAIM]))
+            return ClaimsUser(validated_token), validated_token
+
+        return self.get_user(validated_token), validated_token
+
+    def accepts_claims_user(self, request, validated_token):
+        view = (getattr(request, 'parser_context', None) or {}).get('view')
+        return (
+            request.method in SAFE_METHODS
+            and getattr(view, 'claims_authentication', False)
+            and api_settings.USER_ID_CLAIM in validated_token
+            and ROLE_CLAIM in validated_token
+            and PAGES_CLAIM in validated_token
+            and VERSION_CLAIM in validated_token
+        )
+
+    def check_token_version(self, validated_token, current_version):
+        if current_version is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        token_version = validated_token.get(VERSION_CLAIM)
+        if token_version is not None and token_version != current_version:
+            raise AuthenticationFailed(
+                _("Token is outdated, please refresh it"), code="token_outdated"
+            )
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        self.check_token_version(validated_token, user.token_version)
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        # Hand out a copy so per-request state never leaks into the cache
+        return copy.copy(user)
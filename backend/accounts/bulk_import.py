@@ -0,0 +1,185 @@
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import transaction
+
+from quran_events_backend.response_cache import invalidate_tags
+
+from .models import Profile, User
+from .serializers import UserCreateSerializer
+
+try:
+    import openpyxl
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+
+# Spreadsheet header -> User field
+COLUMNS = {
+    'Username': 'username',
+    'First Name': 'first_name',
+    'Last Name': 'last_name',
+    'Password': 'password',
+    'Role': 'role',
+}
+REQUIRED_COLUMNS = ['Username', 'First Name', 'Last Name', 'Password']
+
+# Below this many passwords the process pool costs more than it saves
+PARALLEL_HASHING_THRESHOLD = 8
+
+
+class UserImportError(Exception):
+    """The uploaded file could not be read or failed validation"""
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+class UserImportRowSerializer(UserCreateSerializer):
+    """Validates one spreadsheet row; username uniqueness is checked once for the whole file"""
+
+    class Meta(UserCreateSerializer.Meta):
+        extra_kwargs = {
+            **UserCreateSerializer.Meta.extra_kwargs,
+            'username': {'required': True, 'validators': [UnicodeUsernameValidator()]},
+        }
+
+
+def read_rows(uploaded_file):
+    """Return (row_number, {field: value}) pairs from a .csv or .xlsx upload"""
+    name = uploaded_file.name.lower()
+    if name.endswith('.csv'):
+        text = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig')
+        try:
+            rows = list(csv.reader(text))
+        except UnicodeDecodeError:
+            raise UserImportError('The CSV file must be UTF-8 encoded')
+        except csv.Error as e:
+            raise UserImportError(f'Failed to read CSV file: {str(e)}')
+    elif name.endswith('.xlsx'):
+        if not OPENPYXL_AVAILABLE:
+            raise UserImportError('Excel functionality not available. Please install openpyxl.')
+        try:
+            workbook = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+        except Exception as e:
+            raise UserImportError(f'Failed to read Excel file: {str(e)}')
+        rows = list(workbook.active.iter_rows(values_only=True))
+        workbook.close()
+    else:
+        raise UserImportError('Invalid file type. Please upload a CSV or Excel file (.csv, .xlsx)')
+
+    if not rows:
+        raise UserImportError('The file is empty')
+
+    headers = [str(header).strip() if header is not None else '' for header in rows[0]]
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in headers]
+    if missing_columns:
+        raise UserImportError(f'Missing required columns: {", ".join(missing_columns)}')
+
+    col_map = {COLUMNS[header]: idx for idx, header in enumerate(headers) if header in COLUMNS}
+    parsed = []
+    for row_num, row in enumerate(rows[1:], start=2):
+        if not any(cell not in (None, '') for cell in row):
+            continue  # Skip blank lines
+        data = {}
+        for field, idx in col_map.items():
+            value = row[idx] if idx < len(row) else None
+            if value is not None and str(value).strip() != '':
+                data[field] = str(value).strip()
+        if 'role' in data:
+            data['role'] = data['role'].lower()
+        parsed.append((row_num, data))
+    return parsed
+
+
+def validate_rows(rows):
+    """Validate every row before anything is written; returns the validated data"""
+    errors = []
+    validated = []
+    seen = {}
+
+    for row_num, data in rows:
+        serializer = UserImportRowSerializer(data=data)
+        if not serializer.is_valid():
+            for field, messages in serializer.errors.items():
+                for message in messages:
+                    errors.append((row_num, f'{field}: {message}'))
+            continue
+        username = serializer.validated_data['username']
+        if username in seen:
+            errors.append((row_num, f'username "{username}" duplicates row {seen[username]}'))
+            continue
+        seen[username] = row_num
+        validated.append(serializer.validated_data)
+
+    existing = User.objects.filter(username__in=list(seen)).values_list('username', flat=True)
+    for username in existing:
+        errors.append((seen[username], f'a user with username "{username}" already exists'))
+
+    if errors:
+        errors.sort(key=lambda error: error[0])
+        raise UserImportError(
+            'Validation failed; no users were imported',
+            [f'Row {row_num}: {message}' for row_num, message in errors],
+        )
+    return validated
+
+
+def _init_hashing_worker(settings_module):
+    # Spawned workers start without Django configured; forked ones inherit it
+    if not settings.configured:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+        django.setup()
+
+
+def hash_passwords(passwords, workers=None):
+    """Hash passwords with the configured hasher, spread across a process pool"""
+    if workers == 1 or len(passwords) < PARALLEL_HASHING_THRESHOLD:
+        return [make_password(password) for password in passwords]
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_hashing_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', ''),),
+    ) as executor:
+        return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+def import_users(rows, workers=None, batch_size=500):
+    """Validate, hash and bulk insert users with their profiles; all or nothing"""
+    validated = validate_rows(rows)
+    hashes = hash_passwords([data['password'] for data in validated], workers=workers)
+
+    users = []
+    for data, password_hash in zip(validated, hashes):
+        user = User(**{**data, 'password': password_hash})
+        # bulk_create skips save(), so fill in what it would have derived
+        user.sort_name = user.build_sort_name()
+        users.append(user)
+
+    with transaction.atomic():
+        users = User.objects.bulk_create(users, batch_size=batch_size)
+        if any(user.pk is None for user in users):
+            # Backends that cannot return ids from a bulk insert
+            ids = dict(User.objects.filter(
+                username__in=[user.username for user in users]
+            ).values_list('username', 'id'))
+            for user in users:
+                user.pk = ids[user.username]
+        Profile.objects.bulk_create(
+            [Profile(user=user, role=user.role) for user in users],
+            batch_size=batch_size,
+        )
+        # bulk_create sends no post_save signals
+        invalidate_tags('users')
+    return users
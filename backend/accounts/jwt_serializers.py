@@ -1,40 +1,59 @@
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework import serializers
-from django.contrib.auth import authenticate
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from .last_login import last_login_buffer
+from .tokens import UserRefreshToken
 
 User = get_user_model()
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
-    """Custom JWT serializer that uses username instead of email"""
+    """JWT login serializer (username + password) issuing tokens with user claims"""
+    
+    token_class = UserRefreshToken
     
-    username = serializers.CharField()
-    password = serializers.CharField()
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if not api_settings.UPDATE_LAST_LOGIN:
+            # Written behind in batches instead of one UPDATE per login
+            last_login_buffer.record(self.user.pk, timezone.now())
+        return data
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh serializer that re-reads the user so new tokens carry current claims"""
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Remove the default email field if it exists
-        if 'email' in self.fields:
-            del self.fields['email']
+    token_class = UserRefreshToken
     
     def validate(self, attrs):
-        username = attrs.get('username')
-        password = attrs.get('password')
+        refresh = self.token_class(attrs['refresh'])
         
-        if username and password:
-            user = authenticate(username=username, password=password)
-            if not user:
-                raise serializers.ValidationError('Invalid credentials.')
-            if not user.is_active:
-                raise serializers.ValidationError('User account is disabled.')
-            attrs['user'] = user
-        else:
-            raise serializers.ValidationError('Must include username and password.')
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]}
+        ).first()
+        if user is None or not user.is_active:
+            raise AuthenticationFailed('User not found or inactive', code='user_inactive')
         
-        return attrs
-    
-    @classmethod
-    def get_token(cls, user):
-        token = super().get_token(user)
-        return token
+        refresh.set_user_claims(user)
+        data = {'access': str(refresh.access_token)}
+        
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    # Attempt to blacklist the given refresh token
+                    refresh.blacklist()
+                except AttributeError:
+                    # If blacklist app not installed, `blacklist` method will
+                    # not be present
+                    pass
+            
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            
+            data['refresh'] = str(refresh)
+        
+        return data
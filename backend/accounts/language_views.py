@@ -6,6 +6,20 @@ from django.utils import translation
 from django.conf import settings
 
 
+def set_language_cookie(response, language):
+    """Store the language in the cookie LocaleMiddleware reads, so no session is needed"""
+    response.set_cookie(
+        settings.LANGUAGE_COOKIE_NAME,
+        language,
+        max_age=settings.LANGUAGE_COOKIE_AGE,
+        path=settings.LANGUAGE_COOKIE_PATH,
+        domain=settings.LANGUAGE_COOKIE_DOMAIN,
+        secure=settings.LANGUAGE_COOKIE_SECURE,
+        httponly=settings.LANGUAGE_COOKIE_HTTPONLY,
+        samesite=settings.LANGUAGE_COOKIE_SAMESITE,
+    )
+
+
 @api_view(['POST'])
 @permission_classes([])  # Allow anonymous users to set language
 def set_language(request):
@@ -18,22 +32,28 @@ def set_language(request):
             'error': 'Unsupported language'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Set language in session
-    request.session['django_language'] = language
+    # Remember the preference on the user when signed in
+    user = request.user
+    if user.is_authenticated and hasattr(user, 'language') and user.language != language:
+        user.language = language
+        user.save(update_fields=['language', 'updated_at'])
     translation.activate(language)
     
-    return Response({
+    response = Response({
         'message': f'Language set to {language}',
         'language': language,
         'available_languages': [{'code': code, 'name': name} for code, name in settings.LANGUAGES]
     })
+    set_language_cookie(response, language)
+    return response
 
 
 @api_view(['GET'])
 @permission_classes([])
 def get_language(request):
     """Get current language"""
-    current_language = request.session.get('django_language', settings.LANGUAGE_CODE)
+    # User preference first, then what LocaleMiddleware resolved from the cookie or Accept-Language
+    current_language = getattr(request.user, 'language', '') or request.LANGUAGE_CODE
     
     return Response({
         'current_language': current_language,
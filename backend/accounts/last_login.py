@@ -0,0 +1,63 @@
+import atexit
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+
+
+class LastLoginBuffer:
+    """Collects last_login timestamps and writes them behind in one batch.
+
+    Logins only record the timestamp in memory; the pending values are
+    flushed with a single bulk UPDATE by a timer started with the first
+    pending login, flush_interval seconds later, or right away when
+    max_pending users are waiting, and once more when the worker exits.
+    """
+
+    def __init__(self, flush_interval=60, max_pending=500):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def record(self, user_id, when):
+        with self._lock:
+            self._pending[user_id] = when
+            due = len(self._pending) >= self.max_pending
+            if not due and self._timer is None:
+                # Started lazily so each forked worker runs its own
+                self._timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.flush()
+
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread's connection would otherwise stay open
+            connections.close_all()
+
+    def flush(self):
+        from .models import User
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            timer, self._timer = self._timer, None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+        if not pending:
+            return 0
+
+        users = [User(pk=user_id, last_login=when) for user_id, when in pending.items()]
+        with transaction.atomic():
+            User.objects.bulk_update(users, ['last_login'], batch_size=500)
+        return len(users)
+
+
+last_login_buffer = LastLoginBuffer(
+    flush_interval=getattr(settings, 'LAST_LOGIN_FLUSH_INTERVAL', 60),
+)
+atexit.register(last_login_buffer.flush)
@@ -0,0 +1,69 @@
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIRequestFactory
+
+from accounts.models import Profile
+from accounts.views import CustomTokenObtainPairView
+
+User = get_user_model()
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+class Command(BaseCommand):
+    """Measure login throughput and separate password hashing from the rest of the path"""
+    help = 'Benchmark the login endpoint, isolating the password hashing cost'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Logins per phase (default: 20)')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        username = f'bench-login-{uuid.uuid4().hex[:8]}'
+        password = uuid.uuid4().hex
+        user = User.objects.create_user(username, password, first_name='Bench', last_name='Login')
+        Profile.objects.create(user=user, role=user.role)
+
+        try:
+            hashing = self.time_hashing(user, password, iterations)
+            login, queries = self.time_logins(username, password, iterations)
+
+            with override_settings(PASSWORD_HASHERS=FAST_HASHERS):
+                user.set_password(password)
+                user.save(update_fields=['password'])
+                cheap_login, _ = self.time_logins(username, password, iterations)
+        finally:
+            user.delete()
+
+        self.stdout.write(f'Database vendor: {connection.vendor}, {iterations} logins per phase')
+        self.stdout.write(f'  password check (default hasher): {hashing * 1000:8.2f} ms')
+        self.stdout.write(f'  full login (default hasher):     {login * 1000:8.2f} ms  ({1 / login:.1f} logins/s per worker)')
+        self.stdout.write(f'  full login (MD5 hasher):         {cheap_login * 1000:8.2f} ms')
+        self.stdout.write(f'  login minus hashing:             {(login - hashing) * 1000:8.2f} ms')
+        self.stdout.write(f'  queries per login:               {queries}')
+
+    def time_hashing(self, user, password, iterations):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            user.check_password(password)
+        return (time.perf_counter() - started) / iterations
+
+    def time_logins(self, username, password, iterations):
+        factory = APIRequestFactory()
+        view = CustomTokenObtainPairView.as_view()
+        payload = {'username': username, 'password': password}
+
+        with CaptureQueriesContext(connection) as queries:
+            response = view(factory.post('/api/auth/login/', payload, format='json'))
+        if response.status_code != 200:
+            raise RuntimeError(f'Login failed with status {response.status_code}')
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            view(factory.post('/api/auth/login/', payload, format='json'))
+        return (time.perf_counter() - started) / iterations, len(queries.captured_queries)
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.bulk_import import UserImportError, import_users, read_rows
+
+
+class Command(BaseCommand):
+    """Bulk import users from a CSV or Excel file without going through the web worker"""
+    help = 'Create users and profiles from a .csv or .xlsx file (Username, First Name, Last Name, Password, Role)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the .csv or .xlsx file')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Processes used for password hashing (default: number of CPUs)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open(options['path'], 'rb') as f:
+                users = import_users(read_rows(f), workers=options['workers'])
+        except OSError as e:
+            raise CommandError(str(e))
+        except UserImportError as e:
+            for error in e.errors:
+                self.stderr.write(error)
+            raise CommandError(str(e))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Imported {len(users)} users in {elapsed:.2f}s'))
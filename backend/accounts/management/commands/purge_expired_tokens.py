@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+class Command(BaseCommand):
+    """Delete expired outstanding (and blacklisted) refresh tokens in small batches"""
+    help = 'Purge expired rows from the JWT outstanding/blacklisted token tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Maximum number of outstanding tokens deleted per transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.05,
+            help='Seconds to sleep between batches (default: 0.05)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        expired = OutstandingToken.objects.filter(expires_at__lt=timezone.now())
+        outstanding_deleted = 0
+        blacklisted_deleted = 0
+
+        while True:
+            # Expired tokens are the oldest ones, so walking by id finds them quickly
+            token_ids = list(expired.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not token_ids:
+                break
+
+            with transaction.atomic():
+                _, deleted = OutstandingToken.objects.filter(id__in=token_ids).delete()
+            outstanding_deleted += deleted.get('token_blacklist.OutstandingToken', 0)
+            blacklisted_deleted += deleted.get('token_blacklist.BlacklistedToken', 0)
+
+            if len(token_ids) < batch_size:
+                break
+            time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {outstanding_deleted} expired outstanding tokens '
+            f'({blacklisted_deleted} of them blacklisted)'
+        ))
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+
+
+class ApiSessionMiddleware(SessionMiddleware):
+    """SessionMiddleware that skips the session store for the JWT API.
+
+    Requests under SESSIONLESS_PATH_PREFIXES get an empty session that is
+    never loaded from or saved to the database, so AuthenticationMiddleware
+    still finds request.session but the API never touches django_session.
+    The admin and other paths keep regular sessions.
+    """
+
+    def is_sessionless(self, request):
+        prefixes = getattr(settings, 'SESSIONLESS_PATH_PREFIXES', ('/api/',))
+        return request.path_info.startswith(tuple(prefixes))
+
+    def process_request(self, request):
+        if self.is_sessionless(request):
+            request.session = self.SessionStore(None)
+            return
+        super().process_request(request)
+
+    def process_response(self, request, response):
+        if self.is_sessionless(request):
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:46
+
+from django.db import migrations, models
+
+
+def backfill_sort_name(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    users = list(User.objects.only('id', 'username', 'first_name', 'last_name'))
+    for user in users:
+        full_name = f'{user.first_name} {user.last_name}'.strip()
+        user.sort_name = (full_name or user.username).lower()
+    User.objects.bulk_update(users, ['sort_name'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_user_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='sort_name',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Lower-cased display name used for ordering and prefix search', max_length=301),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['sort_name', 'id'], name='users_sort_name_idx'),
+        ),
+        migrations.RunPython(backfill_sort_name, migrations.RunPython.noop),
+    ]
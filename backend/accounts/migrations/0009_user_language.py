@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Numbered 0010 until 0009_user_token_version_superuser, which only
+    # changed a help_text, was folded into 0007
+    replaces = [
+        ('accounts', '0010_user_language'),
+    ]
+
+    dependencies = [
+        ('accounts', '0008_user_sort_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='language',
+            field=models.CharField(blank=True, default='', help_text='Preferred interface language code', max_length=10),
+        ),
+    ]
@@ -1,3 +1,5 @@
+import json
+
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 from django.utils.translation import gettext_lazy as _
@@ -36,6 +38,19 @@ class User(AbstractUser):
     email = models.EmailField(unique=True, blank=True, null=True, default=None)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='user')
     permissions = models.JSONField(default=dict, blank=True, help_text="User page permissions")
+    language = models.CharField(max_length=10, blank=True, default='', help_text="Preferred interface language code")
+    token_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Bumped whenever role, permissions, password, active or superuser state change; older tokens must be refreshed"
+    )
+    sort_name = models.CharField(
+        max_length=301,
+        blank=True,
+        default='',
+        editable=False,
+        help_text="Lower-cased display name used for ordering and prefix search"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -48,10 +63,52 @@ class User(AbstractUser):
         db_table = 'users'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            models.Index(fields=['sort_name', 'id'], name='users_sort_name_idx'),
+        ]
+    
+    # Fields baked into access token claims; changing any of them bumps token_version
+    TOKEN_STATE_FIELDS = ('role', 'permissions', 'password', 'is_active', 'is_superuser')
     
     def __str__(self):
         return f"{self.get_full_name()} ({self.email})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(field in field_names for field in cls.TOKEN_STATE_FIELDS):
+            instance._loaded_token_state = instance._token_state()
+        return instance
+    
+    def _token_state(self):
+        return {
+            field: json.dumps(getattr(self, field), sort_keys=True, default=str)
+            for field in self.TOKEN_STATE_FIELDS
+        }
+    
+    def build_sort_name(self):
+        return (self.get_full_name() or self.username).lower()
+    
+    def save(self, *args, **kwargs):
+        self.sort_name = self.build_sort_name()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'first_name', 'last_name', 'username'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'sort_name'}
+        
+        loaded = getattr(self, '_loaded_token_state', None)
+        if loaded is not None:
+            current = self._token_state()
+            changed = {field for field in self.TOKEN_STATE_FIELDS if loaded[field] != current[field]}
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                changed &= set(update_fields)
+            if changed:
+                self.token_version += 1
+                if update_fields is not None:
+                    kwargs['update_fields'] = set(update_fields) | {'token_version'}
+        super().save(*args, **kwargs)
+        self._loaded_token_state = self._token_state()
+    
     @property
     def name(self):
         return self.get_full_name()
@@ -0,0 +1,84 @@
+import enum
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class Page(enum.IntFlag):
+    """Frontend pages a user can be granted, one bit each"""
+    DASHBOARD = 1
+    USERS = 2
+    EVENTS = 4
+    PARTIES = 8
+    LANGUAGE_SETTINGS = 16
+
+
+# Page ids as stored in User.permissions and used by the frontend
+PAGE_IDS = {
+    'dashboard': Page.DASHBOARD,
+    'users': Page.USERS,
+    'events': Page.EVENTS,
+    'parties': Page.PARTIES,
+    'language-settings': Page.LANGUAGE_SETTINGS,
+}
+ALL_PAGES = Page(sum(PAGE_IDS.values()))
+
+# Pages that display events, and so may read them
+EVENT_PAGES = Page.DASHBOARD | Page.EVENTS | Page.PARTIES
+
+
+def compile_permissions(permissions, is_superuser=False):
+    """Compile a permissions JSON into a page bitmask.
+
+    Mirrors use-permissions.ts: without any permissions set, only the
+    dashboard is allowed; otherwise exactly the pages set to a truthy value.
+    Superusers get every page.
+    """
+    if is_superuser:
+        return int(ALL_PAGES)
+    if not permissions:
+        return int(Page.DASHBOARD)
+    if not isinstance(permissions, dict):
+        return 0
+    mask = 0
+    for page_id, bit in PAGE_IDS.items():
+        if permissions.get(page_id):
+            mask |= bit
+    return mask
+
+
+class PageMaskCache:
+    """Per-process LRU of compiled page masks keyed by user id and token_version.
+
+    token_version is bumped whenever permissions change, so an entry for an
+    older version is simply recompiled.
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user):
+        with self._lock:
+            entry = self._entries.get(user.pk)
+            if entry is not None and entry[0] == user.token_version:
+                self._entries.move_to_end(user.pk)
+                return entry[1]
+
+        mask = compile_permissions(user.permissions, user.is_superuser)
+        if self.max_size > 0:
+            with self._lock:
+                self._entries[user.pk] = (user.token_version, mask)
+                self._entries.move_to_end(user.pk)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return mask
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+page_masks = PageMaskCache(max_size=getattr(settings, 'AUTH_USER_CACHE', {}).get('MAX_SIZE', 1024))
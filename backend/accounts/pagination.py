@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class UserDirectoryCursorPagination(CursorPagination):
+    """Cursor pagination for the user directory, alphabetical by name"""
+    ordering = ('sort_name', 'id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
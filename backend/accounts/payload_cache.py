@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import User
+from .serializers import ProfileSerializer, UserSerializer
+
+
+def _cache_key(user_id):
+    return f'accounts:user_payload:{user_id}'
+
+
+def build_user_payload(user, include_permissions=True):
+    """Serialize the {'user': ..., 'profile': ...} payload, serializing the user only once"""
+    user_data = UserSerializer(user, context={'include_permissions': include_permissions}).data
+    profile = getattr(user, 'profile', None) if hasattr(user, 'profile') else None
+    profile_data = None
+    if profile is not None:
+        profile_data = ProfileSerializer(profile, context={'user_data': user_data}).data
+    return {'user': user_data, 'profile': profile_data}
+
+
+def get_user_payload(user):
+    """Cached user/profile payload for the authenticated user.
+
+    Entries are deleted on User/Profile writes and also carry the user's
+    updated_at, so a worker that missed the delete still notices a newer
+    user. A miss costs one query joining users and profiles. The permissions
+    JSON is left out; the frontend only reads it from the login response.
+    """
+    key = _cache_key(user.pk)
+    stamp = user.updated_at.isoformat() if user.updated_at else None
+    cached = cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    fresh_user = User.objects.select_related('profile').get(pk=user.pk)
+    payload = build_user_payload(fresh_user, include_permissions=False)
+    stamp = fresh_user.updated_at.isoformat() if fresh_user.updated_at else None
+    cache.set(key, (stamp, payload), getattr(settings, 'USER_PAYLOAD_CACHE_TIMEOUT', 300))
+    return payload
+
+
+def invalidate_user_payload(user_id):
+    cache.delete(_cache_key(user_id))
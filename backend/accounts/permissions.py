@@ -0,0 +1,69 @@
+from rest_framework import permissions
+
+from .page_permissions import page_masks
+from .tokens import PAGES_CLAIM, ROLE_CLAIM
+
+
+def get_request_role(request):
+    """Role of the requesting user, read from the access token claims when present"""
+    token = request.auth
+    if token is not None and ROLE_CLAIM in token:
+        return token[ROLE_CLAIM]
+    return getattr(request.user, 'role', None)
+
+
+def get_request_pages(request):
+    """Compiled page mask of the requesting user, from the token claim when present"""
+    token = request.auth
+    if token is not None and PAGES_CLAIM in token:
+        return token[PAGES_CLAIM]
+    return page_masks.get(request.user)
+
+
+class HasPagePermission(permissions.BasePermission):
+    """Allow users granted any of the view's pages.
+
+    Views declare ``read_pages`` for safe methods and ``write_pages`` for
+    everything else (defaulting to ``read_pages``); a view without either
+    is not restricted by page.
+    """
+    message = 'You do not have access to this page'
+    read_pages = None
+    write_pages = None
+    
+    def has_permission(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return False
+        read_pages = getattr(view, 'read_pages', self.read_pages)
+        write_pages = getattr(view, 'write_pages', self.write_pages) or read_pages
+        pages = read_pages if request.method in permissions.SAFE_METHODS else write_pages
+        if pages is None:
+            return True
+        return bool(get_request_pages(request) & pages)
+
+
+def requires_pages(read_pages, write_pages=None):
+    """HasPagePermission bound to pages, for function-based views"""
+    return type('RequiresPages', (HasPagePermission,), {
+        'read_pages': read_pages,
+        'write_pages': write_pages,
+    })
+
+
+class IsAdminRole(permissions.BasePermission):
+    """Allow only admins, authorizing from token claims without loading the user"""
+    message = 'Only administrators can perform this action'
+    
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and get_request_role(request) == 'admin')
+
+
+class IsAdminOrCoordinatorRole(permissions.BasePermission):
+    """Allow admins and coordinators, authorizing from token claims"""
+    message = 'Permission denied'
+    
+    def has_permission(self, request, view):
+        return bool(
+            request.user and request.user.is_authenticated
+            and get_request_role(request) in ('admin', 'coordinator')
+        )
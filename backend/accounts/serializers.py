@@ -55,18 +55,36 @@ class UserLoginSerializer(serializers.Serializer):
 
 
 class UserSerializer(serializers.ModelSerializer):
-    """Serializer for user data"""
+    """Serializer for user data; pass include_permissions=False in the context to omit permissions"""
     name = serializers.SerializerMethodField()
     
     class Meta:
         model = User
-        fields = ('id', 'email', 'username', 'first_name', 'last_name', 'name', 'role', 'permissions', 'is_active', 'created_at', 'updated_at')
-        read_only_fields = ('id', 'created_at', 'updated_at')
+        fields = ('id', 'email', 'username', 'first_name', 'last_name', 'name', 'role', 'permissions', 'language', 'is_active', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'language', 'created_at', 'updated_at')
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get('include_permissions', True):
+            fields.pop('permissions')
+        return fields
     
     def get_name(self, obj):
         return obj.get_full_name()
 
 
+class UserDirectorySerializer(serializers.ModelSerializer):
+    """Compact serializer for the participant picker"""
+    name = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = User
+        fields = ('id', 'name')
+    
+    def get_name(self, obj):
+        return obj.get_full_name() or obj.username
+
+
 class ProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile"""
     user = UserSerializer(read_only=True)
@@ -75,6 +93,16 @@ class ProfileSerializer(serializers.ModelSerializer):
         model = Profile
         fields = ('id', 'user', 'role', 'bio', 'phone', 'address', 'avatar', 'created_at', 'updated_at')
         read_only_fields = ('id', 'created_at', 'updated_at')
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        if 'user_data' in self.context:
+            # Reuse an already serialized user instead of serializing it twice
+            fields['user'] = serializers.SerializerMethodField(method_name='get_serialized_user')
+        return fields
+    
+    def get_serialized_user(self, obj):
+        return self.context['user_data']
 
 
 class UserCreateSerializer(serializers.ModelSerializer):
@@ -110,9 +138,11 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         if password:
             instance.set_password(password)
         
-        # Only allow role updates for admins
-        if 'role' in validated_data and not self.context['request'].user.is_admin:
-            validated_data.pop('role')
+        # Only admins may change roles and page permissions; otherwise a user
+        # could grant themselves every page through /profile/update/
+        if not self.context['request'].user.is_admin:
+            validated_data.pop('role', None)
+            validated_data.pop('permissions', None)
         
         # Update other fields
         for attr, value in validated_data.items():
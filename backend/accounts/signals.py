@@ -0,0 +1,49 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from quran_events_backend.response_cache import invalidate_tags
+
+from .authentication import user_cache
+from .models import Profile, User
+from .payload_cache import invalidate_user_payload
+from .tokens import forget_user_version, set_user_version
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the authenticated-user cache entry whenever the user changes"""
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def publish_token_version(sender, instance, **kwargs):
+    """Keep the cached token_version used by claims-only authentication current"""
+    set_user_version(instance.pk, instance.token_version)
+
+
+@receiver(post_delete, sender=User)
+def forget_token_version(sender, instance, **kwargs):
+    forget_user_version(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_payload_for_user(sender, instance, **kwargs):
+    """Drop the cached /auth/check/ and /profile/ payload"""
+    invalidate_user_payload(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_user_payload_for_profile(sender, instance, **kwargs):
+    invalidate_user_payload(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_user_responses(sender, instance, **kwargs):
+    """Drop cached user listings and the event responses embedding user names"""
+    invalidate_tags('users', 'events:list')
@@ -1,3 +1,371 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import user_cache
+from .bulk_import import PARALLEL_HASHING_THRESHOLD, import_users
+from .last_login import LastLoginBuffer
+from .models import Profile, User
+from .page_permissions import Page, compile_permissions
+from .tokens import RevokedTokenSet, UserRefreshToken, revoked_tokens
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """Authenticated requests resolve the user from the per-process cache"""
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.user = User.objects.create_user('reader', 'pass12345!', first_name='Quran', last_name='Reader')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def test_second_request_does_not_load_user(self):
+        self.client.get('/api/language/available/')
+        self.client.get('/api/auth/check/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/language/available/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_user_save_invalidates_cache(self):
+        self.client.get('/api/auth/check/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/check/').status_code, 401)
+
+    def test_warm_auth_check_runs_no_queries(self):
+        self.client.get('/api/auth/check/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/check/')
+        self.assertEqual(response.data['user']['username'], 'reader')
+
+    def test_payload_miss_joins_users_and_profiles(self):
+        Profile.objects.create(user=self.user, role='user', phone='555-0100')
+        self.client.get('/api/language/available/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/profile/')
+        self.assertEqual(len(queries.captured_queries), 1)
+        sql = queries.captured_queries[0]['sql']
+        self.assertIn('FROM "users"', sql)
+        self.assertIn('JOIN "profiles"', sql)
+        self.assertEqual(response.data['profile']['phone'], '555-0100')
+        self.assertNotIn('permissions', response.data['user'])
+
+    def test_user_and_profile_saves_invalidate_payload(self):
+        profile = Profile.objects.create(user=self.user, role='user')
+        self.client.get('/api/auth/check/')
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/check/').data['user']['first_name'], 'Renamed')
+
+        profile.phone = '555-0100'
+        profile.save()
+        self.assertEqual(self.client.get('/api/profile/').data['profile']['phone'], '555-0100')
+
+    def test_payload_from_before_a_missed_delete_is_not_served(self):
+        self.client.get('/api/auth/check/')
+        # As on a worker whose cache never saw the delete: only updated_at gives it away
+        with mock.patch('accounts.signals.invalidate_user_payload'):
+            self.user.last_name = 'Renamed'
+            self.user.save()
+        self.assertEqual(self.client.get('/api/auth/check/').data['user']['last_name'], 'Renamed')
+
+
+class TokenClaimsTests(TestCase):
+    """Access tokens carry role and user version claims"""
+
+    def setUp(self):
+        user_cache.clear()
+        revoked_tokens.clear()
+        self.user = User.objects.create_user('coordinator', 'pass12345!', first_name='Team', last_name='Lead')
+        self.refresh = UserRefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+
+    def test_claims_only_view_does_not_load_user(self):
+        self.client.get('/api/stats/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/events/status/pending/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in queries.captured_queries if 'FROM "users"' in q['sql']])
+
+    def test_role_change_forces_refresh(self):
+        self.user.role = 'admin'
+        self.user.save()
+        response = self.client.get('/api/events/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'token_outdated')
+
+        refreshed = self.client.post('/api/auth/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(refreshed.status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refreshed.json()['access']}")
+        self.assertEqual(self.client.get('/api/events/').status_code, 200)
+
+    def test_non_admin_cannot_create_users(self):
+        response = self.client.post('/api/users/create/', {'username': 'new'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_logged_out_refresh_token_is_rejected(self):
+        response = self.client.post('/api/auth/logout/', {'refresh_token': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        refreshed = self.client.post('/api/auth/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(refreshed.status_code, 401)
+
+    def test_revocation_by_another_worker_is_seen_after_sync(self):
+        jti = self.refresh['jti']
+        syncing = RevokedTokenSet(sync_interval=0)
+        self.assertFalse(syncing.contains(jti))
+        self.assertFalse(revoked_tokens.contains(jti))
+        # Blacklisted behind this worker's back, as another worker's logout would
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=jti))
+        # Not picked up before the next sync
+        with self.assertNumQueries(0):
+            self.assertFalse(revoked_tokens.contains(jti))
+        self.assertTrue(syncing.contains(jti))
+
+        revoked_tokens.clear()
+        refreshed = self.client.post('/api/auth/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(refreshed.status_code, 401)
+
+    def test_buffered_last_login_flushes_without_another_login(self):
+        buffer = LastLoginBuffer(flush_interval=0.01)
+        flushed = threading.Event()
+        with mock.patch.object(buffer, 'flush', side_effect=flushed.set):
+            buffer.record(self.user.pk, timezone.now())
+            self.assertTrue(flushed.wait(5))
+
+        when = timezone.now()
+        buffer = LastLoginBuffer(flush_interval=60)
+        buffer.record(self.user.pk, when)
+        self.assertEqual(buffer.flush(), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, when)
+
+    def test_purge_expired_tokens(self):
+        now = timezone.now()
+        for n in range(3):
+            token = OutstandingToken.objects.create(
+                user=self.user, jti=f'expired-{n}', token='expired', expires_at=now - timedelta(days=1)
+            )
+            if n == 0:
+                BlacklistedToken.objects.create(token=token)
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=self.refresh['jti']))
+
+        out = StringIO()
+        call_command('purge_expired_tokens', batch_size=2, stdout=out)
+        self.assertIn('Purged 3 expired outstanding tokens (1 of them blacklisted)', out.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [self.refresh['jti']])
+        self.assertEqual(BlacklistedToken.objects.get().token.jti, self.refresh['jti'])
+        with self.assertRaises(CommandError):
+            call_command('purge_expired_tokens', batch_size=0, stdout=StringIO())
+
+
+class UserImportTests(TestCase):
+    """Bulk import validates every row before writing anything"""
+
+    def setUp(self):
+        user_cache.clear()
+        self.admin = User.objects.create_user('importer', 'pass12345!', role='admin', permissions={'users': True})
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {UserRefreshToken.for_user(self.admin).access_token}')
+
+    def upload(self, content, name='users.csv'):
+        if isinstance(content, str):
+            content = content.encode()
+        upload = SimpleUploadedFile(name, content, content_type='text/csv')
+        return self.client.post('/api/users/import/', {'file': upload}, format='multipart')
+
+    def test_imports_users_with_profiles(self):
+        response = self.upload(
+            'Username,First Name,Last Name,Password,Role\n'
+            'reader1,Quran,Reader,Str0ng-pass-1,user\n'
+            'reader2,Second,Reader,Str0ng-pass-2,\n'
+        )
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(username='reader1')
+        self.assertTrue(user.check_password('Str0ng-pass-1'))
+        self.assertEqual(user.sort_name, 'quran reader')
+        self.assertEqual(user.profile.role, 'user')
+        self.assertTrue(Profile.objects.filter(user__username='reader2').exists())
+
+    def test_invalid_row_rejects_whole_file(self):
+        response = self.upload(
+            'Username,First Name,Last Name,Password\n'
+            'reader1,Quran,Reader,Str0ng-pass-1\n'
+            'importer,Taken,Name,Str0ng-pass-2\n'
+            'reader3,Short,Password,123\n'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.data['errors'][0].startswith('Row 3:'))
+        self.assertTrue(all(error.startswith(('Row 3:', 'Row 4:')) for error in response.data['errors']))
+        self.assertFalse(User.objects.filter(username='reader1').exists())
+
+    def test_unreadable_files_are_rejected(self):
+        header = 'Username,First Name,Last Name,Password\n'
+        for content, name in (
+            (header.encode() + 'reader1,Zoë,Reader,Str0ng-pass-1\n'.encode('latin-1'), 'users.csv'),
+            (header + 'reader1,"' + 'x' * 200000 + '",Reader,Str0ng-pass-1\n', 'users.csv'),
+            (header + 'reader1,Quran,Reader,Str0ng-pass-1\n', 'users.xls'),
+        ):
+            response = self.upload(content, name)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('error', response.data)
+        self.assertFalse(User.objects.filter(username='reader1').exists())
+
+    @override_settings(USER_IMPORT_MAX_ROWS=2)
+    def test_large_files_are_sent_to_the_command(self):
+        response = self.upload(
+            'Username,First Name,Last Name,Password\n'
+            + ''.join(f'reader{n},Quran,Reader,Str0ng-pass-{n}\n' for n in range(3))
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('import_users', response.data['error'])
+
+    def test_parallel_password_hashing(self):
+        rows = [
+            (n + 2, {'username': f'reader{n}', 'first_name': 'Quran', 'last_name': 'Reader',
+                     'password': f'Str0ng-pass-{n}'})
+            for n in range(PARALLEL_HASHING_THRESHOLD)
+        ]
+        users = import_users(rows, workers=2)
+        self.assertEqual(len(users), PARALLEL_HASHING_THRESHOLD)
+        for n in (0, PARALLEL_HASHING_THRESHOLD - 1):
+            self.assertTrue(User.objects.get(username=f'reader{n}').check_password(f'Str0ng-pass-{n}'))
+
+
+class PagePermissionTests(TestCase):
+    """Endpoints enforce the same page permissions as the frontend"""
+
+    def setUp(self):
+        user_cache.clear()
+
+    def client_for(self, permissions, **extra):
+        user = User.objects.create_user(f'user{User.objects.count()}', 'pass12345!', permissions=permissions, **extra)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {UserRefreshToken.for_user(user).access_token}')
+        return client
+
+    def test_compile_mirrors_frontend_rules(self):
+        self.assertEqual(compile_permissions({}), Page.DASHBOARD)
+        self.assertEqual(compile_permissions({'users': False}), 0)
+        self.assertEqual(compile_permissions({'events': True, 'parties': True}), Page.EVENTS | Page.PARTIES)
+        self.assertEqual(compile_permissions({}, is_superuser=True), sum(Page))
+
+    def test_dashboard_only_user_reads_but_cannot_write_events(self):
+        client = self.client_for({})
+        self.assertEqual(client.get('/api/events/').status_code, 200)
+        self.assertEqual(client.get('/api/users/').status_code, 403)
+        self.assertEqual(client.post('/api/events/', {}, format='json').status_code, 403)
+
+    def test_user_list_includes_permissions_only_for_users_page(self):
+        response = self.client_for({'events': True}).get('/api/users/')
+        self.assertNotIn('permissions', response.data['results'][0])
+        response = self.client_for({'users': True}).get('/api/users/')
+        self.assertIn('permissions', response.data['results'][0])
+
+    def test_permission_change_requires_new_token(self):
+        user = User.objects.create_user('changing', 'pass12345!', permissions={'events': True})
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {UserRefreshToken.for_user(user).access_token}')
+        self.assertEqual(client.get('/api/users/').status_code, 200)
+        user.permissions = {'dashboard': True}
+        user.save()
+        self.assertEqual(client.get('/api/users/').status_code, 401)
+
+    def test_non_admin_cannot_widen_own_pages(self):
+        user = User.objects.create_user('widening', 'pass12345!', permissions={'dashboard': True})
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.patch(
+            '/api/profile/update/',
+            {'first_name': 'Renamed', 'role': 'admin', 'permissions': {'events': True, 'users': True}},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        user.refresh_from_db()
+        self.assertEqual(user.first_name, 'Renamed')
+        self.assertEqual((user.role, user.permissions), ('user', {'dashboard': True}))
+
+    def test_user_directory_prefix_search_pages_by_name(self):
+        client = self.client_for({'events': True})
+        for first_name, last_name in (('Aisha', 'Khan'), ('Ahmad', 'Ali'), ('Bilal', 'Omar'), ('Amina', 'Yusuf')):
+            User.objects.create_user(first_name.lower(), 'pass12345!', first_name=first_name, last_name=last_name)
+        User.objects.create_user('ahmed', 'pass12345!', first_name='Ahmed', last_name='Zaid', is_active=False)
+
+        names = []
+        url = '/api/users/directory/?q=A&page_size=2'
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 2)
+            names += [row['name'] for row in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(names, ['Ahmad Ali', 'Aisha Khan', 'Amina Yusuf'])
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+        self.assertEqual(self.client_for({'dashboard': True}).get('/api/users/directory/').status_code, 403)
+
+    def test_user_directory_etag(self):
+        client = self.client_for({'events': True})
+        user = User.objects.create_user('aisha', 'pass12345!', first_name='Aisha', last_name='Khan')
+        response = client.get('/api/users/directory/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        cached = client.get('/api/users/directory/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached['ETag'], etag)
+        self.assertEqual(client.get('/api/users/directory/?q=a', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        user.last_name = 'Rahman'
+        user.save()
+        changed = client.get('/api/users/directory/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+    def test_user_directory_revalidates_compressed_pages(self):
+        client = self.client_for({'events': True})
+        for n in range(40):
+            User.objects.create_user(f'reader{n}', 'pass12345!', first_name='Quran', last_name=f'Reader {n}')
+        response = client.get('/api/users/directory/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertTrue(response['ETag'].startswith('W/'))
+
+        cached = client.get('/api/users/directory/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+
+class LanguagePreferenceTests(TestCase):
+    """Language is resolved without sessions on the API"""
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user('speaker', 'pass12345!')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {UserRefreshToken.for_user(self.user).access_token}')
+
+    def test_set_language_stores_preference_and_cookie(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/language/set/', {'language': 'ar'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.cookies['django_language'].value, 'ar')
+        self.assertFalse(any('django_session' in query['sql'] for query in queries.captured_queries))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.language, 'ar')
+        self.assertEqual(self.client.get('/api/language/get/').data['current_language'], 'ar')
+
+    def test_anonymous_language_from_accept_language(self):
+        response = APIClient().get('/api/language/get/', HTTP_ACCEPT_LANGUAGE='ar')
+        self.assertEqual(response.data['current_language'], 'ar')
+        self.assertNotIn('sessionid', response.cookies)
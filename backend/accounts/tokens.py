@@ -0,0 +1,142 @@
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .page_permissions import compile_permissions
+
+ROLE_CLAIM = 'role'
+PERMISSIONS_CLAIM = 'perms'
+VERSION_CLAIM = 'ver'
+PAGES_CLAIM = 'pages'
+
+
+def permissions_digest(permissions):
+    """Short stable digest of a user's page permissions JSON"""
+    canonical = json.dumps(permissions or {}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode()).hexdigest()[:12]
+
+
+def _version_cache_key(user_id):
+    return f'accounts:token_version:{user_id}'
+
+
+def _version_cache_timeout():
+    return getattr(settings, 'AUTH_USER_CACHE', {}).get('TTL', 60)
+
+
+def get_user_version(user_id):
+    """Current token_version of a user, or None if the user no longer exists.
+
+    Served from the Django cache; a miss costs one single-column query.
+    """
+    from .models import User
+
+    key = _version_cache_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(pk=user_id).values_list('token_version', flat=True).first()
+        if version is not None:
+            cache.set(key, version, _version_cache_timeout())
+    return version
+
+
+def set_user_version(user_id, version):
+    cache.set(_version_cache_key(user_id), version, _version_cache_timeout())
+
+
+def forget_user_version(user_id):
+    cache.delete(_version_cache_key(user_id))
+
+
+class RevokedTokenSet:
+    """Per-worker in-memory set of blacklisted refresh token jtis.
+
+    Warmed from the token_blacklist tables on first use, then kept current
+    by fetching only rows newer than the last one seen, at most once every
+    sync_interval seconds. Entries are dropped once their token expires, so
+    the set never holds more than the tokens that could still be presented.
+    """
+
+    def __init__(self, sync_interval=2):
+        self.sync_interval = sync_interval
+        self._expiry_by_jti = {}
+        self._last_seen_id = 0
+        self._next_sync = 0
+        self._lock = threading.Lock()
+
+    def _sync(self):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        now = timezone.now()
+        rows = BlacklistedToken.objects.filter(
+            id__gt=self._last_seen_id,
+            token__expires_at__gt=now,
+        ).order_by('id').values_list('id', 'token__jti', 'token__expires_at')
+
+        for row_id, jti, expires_at in rows:
+            self._expiry_by_jti[jti] = expires_at
+            self._last_seen_id = row_id
+
+        self._expiry_by_jti = {
+            jti: expires_at for jti, expires_at in self._expiry_by_jti.items() if expires_at > now
+        }
+
+    def contains(self, jti):
+        with self._lock:
+            if time.monotonic() >= self._next_sync:
+                self._sync()
+                self._next_sync = time.monotonic() + self.sync_interval
+            return jti in self._expiry_by_jti
+
+    def add(self, jti, expires_at):
+        with self._lock:
+            self._expiry_by_jti[jti] = expires_at
+
+    def clear(self):
+        with self._lock:
+            self._expiry_by_jti = {}
+            self._last_seen_id = 0
+            self._next_sync = 0
+
+
+revoked_tokens = RevokedTokenSet(sync_interval=getattr(settings, 'REVOKED_TOKENS_SYNC_INTERVAL', 2))
+
+
+class UserRefreshToken(RefreshToken):
+    """Refresh token carrying role, permissions digest, page mask and user version claims.
+
+    The claims are copied onto every access token derived from it, so
+    role checks can be made from the token alone.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.set_user_claims(user)
+        return token
+
+    def check_blacklist(self):
+        """Check the per-worker revoked set instead of querying the blacklist table"""
+        if revoked_tokens.contains(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        revoked_tokens.add(self.payload[api_settings.JTI_CLAIM], datetime_from_epoch(self.payload['exp']))
+        return blacklisted
+
+    def set_user_claims(self, user):
+        self[ROLE_CLAIM] = user.role
+        self[PERMISSIONS_CLAIM] = permissions_digest(user.permissions)
+        self[PAGES_CLAIM] = compile_permissions(user.permissions, user.is_superuser)
+        self[VERSION_CLAIM] = user.token_version
@@ -13,7 +13,9 @@ urlpatterns = [
     
     # User Management
     path('users/', views.UserListView.as_view(), name='user_list'),
+    path('users/directory/', views.UserDirectoryView.as_view(), name='user_directory'),
     path('users/create/', views.UserCreateView.as_view(), name='user_create'),
+    path('users/import/', views.UserImportView.as_view(), name='user_import'),
     path('users/<int:pk>/', views.UserDetailView.as_view(), name='user_detail'),
     path('profile/', views.UserProfileView.as_view(), name='user_profile'),
     path('profile/update/', views.UserUpdateView.as_view(), name='user_update'),
@@ -2,47 +2,51 @@ from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.exceptions import PermissionDenied
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.views import TokenObtainPairView
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+import hashlib
+from quran_events_backend.response_cache import CachedResponseMixin
+from quran_events_backend.routers import ReplicaReadMixin, replica_reads
 from .models import User, Profile
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserSerializer,
-    ProfileSerializer, UserUpdateSerializer, UserCreateSerializer
+    ProfileSerializer, UserUpdateSerializer, UserCreateSerializer,
+    UserDirectorySerializer
 )
-from .jwt_serializers import CustomTokenObtainPairSerializer
+from .authentication import user_cache
+from .bulk_import import UserImportError, import_users, read_rows
+from .language_views import set_language_cookie
+from .pagination import UserDirectoryCursorPagination
+from .payload_cache import build_user_payload, get_user_payload
+from .page_permissions import Page
+from .permissions import HasPagePermission, IsAdminRole, get_request_pages
+from .tokens import UserRefreshToken
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     """Custom JWT token view with user data"""
-    # Temporarily use default serializer to test
-    # serializer_class = CustomTokenObtainPairSerializer
     
     def post(self, request, *args, **kwargs):
-        # Debug logging
-        print(f"Login attempt: username={request.data.get('username')}")
-        
-        response = super().post(request, *args, **kwargs)
-        
-        print(f"Response status: {response.status_code}")
-        if hasattr(response, 'data'):
-            print(f"Response data keys: {list(response.data.keys()) if response.data else 'None'}")
-        
-        if response.status_code == 200:
-            # Get user data using username
-            username = request.data.get('username')
-            try:
-                user = User.objects.get(username=username)
-                user_data = UserSerializer(user).data
-                
-                # Add user data to the existing response (don't override tokens)
-                response.data['user'] = user_data
-                response.data['profile'] = ProfileSerializer(user.profile).data if hasattr(user, 'profile') else None
-            except Exception as e:
-                print(f"Error getting user data: {e}")
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
         
+        # The authentication backend already loaded the user with its profile
+        user = serializer.user
+        data = dict(serializer.validated_data)
+        data.update(build_user_payload(user))
+        response = Response(data, status=status.HTTP_200_OK)
+        if user.language:
+            # Restore the user's language for later requests without a session
+            set_language_cookie(response, user.language)
         return response
 
 
@@ -61,7 +65,7 @@ class UserRegistrationView(APIView):
                     profile, created = Profile.objects.get_or_create(user=user, defaults={'role': user.role})
                     
                     # Generate tokens
-                    refresh = RefreshToken.for_user(user)
+                    refresh = UserRefreshToken.for_user(user)
                     access_token = refresh.access_token
                     
                     return Response({
@@ -91,7 +95,7 @@ class UserLoginView(APIView):
             user = serializer.validated_data['user']
             
             # Generate tokens
-            refresh = RefreshToken.for_user(user)
+            refresh = UserRefreshToken.for_user(user)
             access_token = refresh.access_token
             
             return Response({
@@ -107,19 +111,15 @@ class UserLoginView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserProfileView(APIView):
+class UserProfileView(ReplicaReadMixin, APIView):
     """Get current user profile"""
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        user = request.user
-        return Response({
-            'user': UserSerializer(user).data,
-            'profile': ProfileSerializer(user.profile).data if hasattr(user, 'profile') else None
-        })
+        return Response(get_user_payload(request.user))
 
 
-class UserUpdateView(APIView):
+class UserUpdateView(ReplicaReadMixin, APIView):
     """Update user profile"""
     permission_classes = [permissions.IsAuthenticated]
     
@@ -134,33 +134,76 @@ class UserUpdateView(APIView):
             serializer.save()
             return Response({
                 'message': 'Profile updated successfully',
-                'user': UserSerializer(request.user).data,
-                'profile': ProfileSerializer(request.user.profile).data if hasattr(request.user, 'profile') else None
+                **get_user_payload(request.user)
             })
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserListView(generics.ListAPIView):
+class UserListView(ReplicaReadMixin, CachedResponseMixin, generics.ListAPIView):
     """List all users for participant selection"""
     serializer_class = UserSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, HasPagePermission]
+    read_pages = Page.USERS | Page.EVENTS
+    claims_authentication = True
+    cache_tags = ('users',)
     
     def get_queryset(self):
         # All authenticated users can view the user list for participant selection
         return User.objects.filter(is_active=True).order_by('-created_at')
+    
+    def get_serializer_context(self):
+        # Only the users settings page needs everyone's permissions
+        context = super().get_serializer_context()
+        context['include_permissions'] = bool(get_request_pages(self.request) & Page.USERS)
+        return context
 
 
-class UserCreateView(generics.CreateAPIView):
+class UserDirectoryView(ReplicaReadMixin, generics.ListAPIView):
+    """Compact id/name listing of active users for the participant picker"""
+    serializer_class = UserDirectorySerializer
+    permission_classes = [permissions.IsAuthenticated, HasPagePermission]
+    read_pages = Page.USERS | Page.EVENTS
+    pagination_class = UserDirectoryCursorPagination
+    claims_authentication = True
+    
+    def get_queryset(self):
+        queryset = User.objects.filter(is_active=True).only(
+            'id', 'username', 'first_name', 'last_name', 'sort_name'
+        )
+        
+        # Prefix search as a range on the indexed sort_name column
+        search = self.request.query_params.get('q', '').strip().lower()
+        if search:
+            queryset = queryset.filter(sort_name__gte=search, sort_name__lt=search + '\uffff')
+        
+        return queryset
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        state = queryset.aggregate(count=Count('id'), last_change=Max('updated_at'))
+        fingerprint = f"{state['count']}:{state['last_change']}:{request.get_full_path()}"
+        etag = quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+        
+        # Weak comparison: compression middleware sends the tag back as W/"..."
+        client_etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etag in [client_etag.removeprefix('W/') for client_etag in client_etags]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().list(request, *args, **kwargs)
+        
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class UserCreateView(ReplicaReadMixin, generics.CreateAPIView):
     """Create user view (admin only)"""
     serializer_class = UserCreateSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, IsAdminRole, HasPagePermission]
+    read_pages = Page.USERS
     
     def perform_create(self, serializer):
-        # Only admins can create users
-        if not self.request.user.is_admin:
-            raise PermissionDenied("Only administrators can create users")
-        
         with transaction.atomic():
             user = serializer.save()
             # Create profile for the new user with role
@@ -183,27 +226,53 @@ class UserCreateView(generics.CreateAPIView):
         }, status=status.HTTP_201_CREATED)
 
 
-class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
+class UserImportView(ReplicaReadMixin, APIView):
+    """Create users in bulk from a CSV or Excel file (admin only)"""
+    permission_classes = [permissions.IsAuthenticated, IsAdminRole, HasPagePermission]
+    read_pages = Page.USERS
+    
+    def post(self, request):
+        if 'file' not in request.FILES:
+            return Response(
+                {'error': 'No file provided'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            rows = read_rows(request.FILES['file'])
+            max_rows = getattr(settings, 'USER_IMPORT_MAX_ROWS', 200)
+            if len(rows) > max_rows:
+                raise UserImportError(
+                    f'Files with more than {max_rows} users must be imported with the import_users management command'
+                )
+            users = import_users(rows)
+        except UserImportError as e:
+            response_data = {'error': str(e)}
+            if e.errors:
+                response_data['errors'] = e.errors[:50]  # Limit the payload for large files
+                response_data['error_count'] = len(e.errors)
+            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'message': f'Successfully imported {len(users)} users',
+            'imported_count': len(users),
+        }, status=status.HTTP_201_CREATED)
+
+
+class UserDetailView(ReplicaReadMixin, CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     """User detail view (admin only)"""
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, IsAdminRole, HasPagePermission]
+    read_pages = Page.USERS
+    cache_tags = ('users',)
     
     def get_queryset(self):
-        # Only admins can manage users
-        if self.request.user.is_admin:
-            return User.objects.all()
-        return User.objects.none()
+        return User.objects.all()
     
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
             return UserUpdateSerializer
         return UserSerializer
     
-    def perform_update(self, serializer):
-        # Only admins can update users
-        if not self.request.user.is_admin:
-            raise PermissionDenied("Only administrators can update users")
-        serializer.save()
-    
     def destroy(self, request, *args, **kwargs):
         # Prevent admin from deleting themselves
         user = self.get_object()
@@ -220,9 +289,10 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
 def logout_view(request):
     """Logout endpoint"""
     try:
+        user_cache.invalidate(request.user.pk)
         refresh_token = request.data.get('refresh_token')
         if refresh_token:
-            token = RefreshToken(refresh_token)
+            token = UserRefreshToken(refresh_token)
             token.blacklist()
         return Response({'message': 'Logout successful'})
     except Exception as e:
@@ -231,10 +301,10 @@ def logout_view(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@replica_reads
 def check_auth_view(request):
     """Check authentication status"""
     return Response({
         'authenticated': True,
-        'user': UserSerializer(request.user).data,
-        'profile': ProfileSerializer(request.user.profile).data if hasattr(request.user, 'profile') else None
+        **get_user_payload(request.user)
     })
\ No newline at end of file
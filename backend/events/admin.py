@@ -5,14 +5,14 @@ from .models import Event, Song, EventParticipant, EventStats
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     """Event admin"""
-    list_display = ('day', 'date', 'time', 'place', 'status', 'number_of_participants', 'created_by', 'created_at')
+    list_display = ('day', 'date', 'time', 'place', 'status', 'number_of_participants', 'participants_count', 'created_by', 'created_at')
     list_filter = ('status', 'day', 'date', 'created_at')
     search_fields = ('day', 'place', 'created_by__email', 'created_by__username')
     ordering = ('-created_at',)
     
     fieldsets = (
         ('Basic Information', {
-            'fields': ('day', 'date', 'time', 'duration', 'place', 'number_of_participants', 'status')
+            'fields': ('day', 'date', 'time', 'duration', 'place', 'number_of_participants', 'participants_count', 'status')
         }),
         ('Meeting Details', {
             'fields': ('meeting_time', 'meeting_date', 'place_of_meeting'),
@@ -28,7 +28,7 @@ class EventAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('participants_count', 'created_at', 'updated_at')
     
     def save_model(self, request, obj, form, change):
         if not change:  # Only set created_by for new objects
@@ -66,6 +66,22 @@ class EventParticipantAdmin(admin.ModelAdmin):
     )
     
     readonly_fields = ('joined_at',)
+    
+    def save_model(self, request, obj, form, change):
+        previous_event_id = None
+        if change:
+            previous_event_id = EventParticipant.objects.filter(pk=obj.pk).values_list('event_id', flat=True).first()
+        super().save_model(request, obj, form, change)
+        Event.sync_participants_count({obj.event_id, previous_event_id} - {None})
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        Event.sync_participants_count([obj.event_id])
+    
+    def delete_queryset(self, request, queryset):
+        event_ids = set(queryset.values_list('event_id', flat=True))
+        super().delete_queryset(request, queryset)
+        Event.sync_participants_count(event_ids)
 
 
 @admin.register(EventStats)
@@ -0,0 +1,94 @@
+"""
+Event responses assembled from stored EventDocument bodies.
+
+Each event's EventSerializer JSON, songs, dress details and participants
+included, is rendered once when the event or one of its children changes
+(EventDocument.rebuild(), called through models.event_data_changed()).
+Reads fetch the ids and dates of the matching events, then splice the
+stored bodies into the response without serializing anything.
+
+is_upcoming and is_past depend on the day the event is read, so they are
+left out of the stored body and appended per request. They are the last
+EventSerializer fields, which keeps the output identical to the
+serializer's.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.http import Http404
+from django.utils import timezone
+
+from quran_events_backend.renderers import ORJSONRenderer, RawJSON
+
+from .fast_serializers import event_values, serialize_events
+from .models import Event, EventDocument
+
+# Columns the read paths fetch before splicing documents
+DOCUMENT_ROW_FIELDS = ('id', 'date')
+
+TIME_RELATIVE_FIELDS = ('is_upcoming', 'is_past')
+
+# Closing of a document, keyed by is_upcoming
+_DOCUMENT_ENDINGS = {
+    True: ',"is_upcoming":true,"is_past":false}',
+    False: ',"is_upcoming":false,"is_past":true}',
+}
+
+
+def render_documents(event_ids):
+    """Stored body of each existing event among event_ids, by id"""
+    rows = event_values(Event.objects.filter(id__in=event_ids).order_by())
+    renderer = ORJSONRenderer()
+    bodies = {}
+    for data in serialize_events(rows):
+        for field in TIME_RELATIVE_FIELDS:
+            del data[field]
+        bodies[data['id']] = renderer.render(data).decode()
+    return bodies
+
+
+def get_documents(event_ids):
+    """Stored bodies by id; events without a document yet are rendered without saving"""
+    bodies = dict(EventDocument.objects.filter(event_id__in=event_ids).values_list('event_id', 'body'))
+    missing = [event_id for event_id in event_ids if event_id not in bodies]
+    if missing:
+        bodies.update(render_documents(missing))
+    return bodies
+
+
+def _join_documents(rows, today):
+    """JSON array of the events in rows (DOCUMENT_ROW_FIELDS dicts), in order"""
+    rows = list(rows)
+    bodies = get_documents([row['id'] for row in rows])
+    return '[' + ','.join(
+        bodies[row['id']][:-1] + _DOCUMENT_ENDINGS[row['date'] >= today]
+        for row in rows
+        # Deleted since the rows were read
+        if row['id'] in bodies
+    ) + ']'
+
+
+def events_json(rows, today=None):
+    """EventSerializer(events, many=True) output for rows of values(*DOCUMENT_ROW_FIELDS)"""
+    if today is None:
+        today = timezone.now().date()
+    return RawJSON(_join_documents(rows, today).encode())
+
+
+def event_json(row, today=None):
+    """EventSerializer(event) output for one values(*DOCUMENT_ROW_FIELDS) row"""
+    if today is None:
+        today = timezone.now().date()
+    body = get_documents([row['id']]).get(row['id'])
+    if body is None:
+        # Deleted since the row was read
+        raise Http404
+    return RawJSON((body[:-1] + _DOCUMENT_ENDINGS[row['date'] >= today]).encode())
+
+
+def paginated_events_json(paginator, rows, today=None):
+    """The paginator's response for the page in rows, its results spliced from documents"""
+    envelope = ORJSONRenderer().render(paginator.get_paginated_response([]).data)
+    if not envelope.endswith(b'[]}'):
+        raise ImproperlyConfigured(
+            f'{type(paginator).__name__} must put the results last in its response'
+        )
+    return RawJSON(envelope[:-3] + events_json(rows, today) + b'}')
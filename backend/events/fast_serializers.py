@@ -0,0 +1,141 @@
+"""
+Values()-based EventSerializer output, used to render the stored event
+documents (events.documents).
+
+EventSerializer builds a model instance and a tree of field objects for
+every event, song, dress detail and participant. Here events come from a
+single values() query, each relation from one more values() query over
+all the events at once, and the output dicts are assembled directly in
+the same shape as EventSerializer(many=True).data.
+
+Keep EVENT_COLUMNS and the dict builders in step with EventSerializer;
+events.tests checks that both produce the same JSON.
+"""
+from collections import defaultdict
+
+from django.utils import timezone
+
+from .models import DressDetail, EventParticipant, Song
+
+# Event columns and EventQuerySet.with_computed_fields() annotations read by
+# values(), in EventSerializer.Meta.fields order
+EVENT_COLUMNS = (
+    'id', 'day', 'date', 'time', 'duration', 'place', 'number_of_participants',
+    'status', 'meeting_time', 'meeting_date', 'place_of_meeting', 'vehicle',
+    'camera_man', 'participation_type', 'event_reason', 'created_by_id', 'created_by_name',
+    'created_at', 'updated_at', 'participants_count', 'is_upcoming', 'is_past',
+)
+
+
+def _iso(value):
+    """DateField/TimeField representation"""
+    return value.isoformat() if value is not None else None
+
+
+def _datetime(value, tz):
+    """DateTimeField representation: in the current time zone, with 'Z' for UTC"""
+    if value is None:
+        return None
+    value = value.astimezone(tz).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def event_values(queryset):
+    """The event rows serialize_events() needs; paginate this instead of the model queryset"""
+    return queryset.prefetch_related(None).with_computed_fields().values(*EVENT_COLUMNS)
+
+
+def _group_songs(event_ids, tz):
+    songs = defaultdict(list)
+    rows = Song.objects.filter(event_id__in=event_ids).order_by('event_id', 'order').values_list(
+        'event_id', 'id', 'title', 'artist', 'duration', 'order', 'created_at'
+    )
+    for event_id, pk, title, artist, duration, order, created_at in rows:
+        songs[event_id].append({
+            'id': pk,
+            'title': title,
+            'artist': artist,
+            'duration': duration,
+            'order': order,
+            'created_at': _datetime(created_at, tz),
+        })
+    return songs
+
+
+def _group_dress_details(event_ids, tz):
+    dress_details = defaultdict(list)
+    rows = DressDetail.objects.filter(event_id__in=event_ids).order_by('event_id', 'order').values_list(
+        'event_id', 'id', 'description', 'order', 'created_at'
+    )
+    for event_id, pk, description, order, created_at in rows:
+        dress_details[event_id].append({
+            'id': pk,
+            'description': description,
+            'order': order,
+            'created_at': _datetime(created_at, tz),
+        })
+    return dress_details
+
+
+def _group_participants(event_ids, tz):
+    participants = defaultdict(list)
+    rows = EventParticipant.objects.with_user_name().filter(event_id__in=event_ids).order_by(
+        'event_id', 'id'
+    ).values_list('event_id', 'id', 'user_id', 'user_name', 'user__email', 'joined_at', 'is_confirmed')
+    for event_id, pk, user_id, user_name, email, joined_at, is_confirmed in rows:
+        participants[event_id].append({
+            'id': pk,
+            'user': f'{user_name} ({email})',  # str(user)
+            'user_id': user_id,
+            'user_name': user_name,
+            'joined_at': _datetime(joined_at, tz),
+            'is_confirmed': is_confirmed,
+        })
+    return participants
+
+
+def serialize_events(rows):
+    """EventSerializer(events, many=True).data for rows from event_values()"""
+    rows = list(rows)
+    event_ids = [row['id'] for row in rows]
+    if not event_ids:
+        return []
+
+    tz = timezone.get_current_timezone()
+    songs = _group_songs(event_ids, tz)
+    dress_details = _group_dress_details(event_ids, tz)
+    participants = _group_participants(event_ids, tz)
+
+    data = []
+    for row in rows:
+        event_id = row['id']
+        data.append({
+            'id': event_id,
+            'day': row['day'],
+            'date': _iso(row['date']),
+            'time': _iso(row['time']),
+            'duration': row['duration'],
+            'place': row['place'],
+            'number_of_participants': row['number_of_participants'],
+            'status': row['status'],
+            'meeting_time': _iso(row['meeting_time']),
+            'meeting_date': _iso(row['meeting_date']),
+            'place_of_meeting': row['place_of_meeting'],
+            'vehicle': row['vehicle'],
+            'camera_man': row['camera_man'],
+            'participation_type': row['participation_type'],
+            'event_reason': row['event_reason'],
+            'created_by': row['created_by_id'],
+            'created_by_name': row['created_by_name'],
+            'created_at': _datetime(row['created_at'], tz),
+            'updated_at': _datetime(row['updated_at'], tz),
+            'songs': songs.get(event_id, []),
+            'dress_details': dress_details.get(event_id, []),
+            'participants': participants.get(event_id, []),
+            'participants_count': row['participants_count'],
+            'is_upcoming': row['is_upcoming'],
+            'is_past': row['is_past'],
+        })
+    return data
@@ -0,0 +1,70 @@
+"""Throwaway event data and timing shared by the serialization benchmarks"""
+from datetime import date, time, timedelta
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+
+from events.models import DressDetail, Event, EventParticipant, Song
+
+User = get_user_model()
+
+
+def timed(func, repeat):
+    """Best of repeat runs, in milliseconds, and the last result"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = perf_counter()
+        result = func()
+        best = min(best, perf_counter() - started)
+    return best * 1000, result
+
+
+def seed_bench_events(run_id, count, participants):
+    """Create events with songs, dress details and participants, queried like the list views"""
+    User.objects.bulk_create([
+        User(
+            username=f'bench-events-{run_id}-{i}', email=f'bench-{run_id}-{i}@example.com',
+            first_name='Bench', last_name=f'Participant {i}', password='!',
+        )
+        for i in range(max(participants, 1))
+    ])
+    users = list(User.objects.filter(username__startswith=f'bench-events-{run_id}-'))
+    start = date.today() + timedelta(days=1)
+    Event.objects.bulk_create([
+        Event(
+            day=(start + timedelta(days=i)).strftime('%A'),
+            date=start + timedelta(days=i),
+            time=time(18, 30),
+            duration=90,
+            place=f'Bench {run_id} - Community center hall {i % 7}',
+            number_of_participants=participants + 5,
+            participants_count=participants,
+            status=('pending', 'confirmed', 'completed')[i % 3],
+            meeting_time=time(17, 45),
+            meeting_date=start + timedelta(days=i),
+            place_of_meeting='Main entrance',
+            created_by=users[0],
+        )
+        for i in range(count)
+    ])
+    events = list(Event.objects.filter(place__startswith=f'Bench {run_id}'))
+    Song.objects.bulk_create([
+        Song(event=event, title=f'Nasheed {n + 1}', artist='Ensemble', duration=240, order=n)
+        for event in events for n in range(3)
+    ])
+    DressDetail.objects.bulk_create([
+        DressDetail(event=event, description=description, order=n)
+        for event in events for n, description in enumerate(('White thobe', 'Black shoes'))
+    ])
+    EventParticipant.objects.bulk_create([
+        EventParticipant(event=event, user=user, is_confirmed=bool(n % 2))
+        for event in events for n, user in enumerate(users[:participants])
+    ])
+    return Event.objects.filter(place__startswith=f'Bench {run_id}').select_related(
+        'created_by'
+    ).prefetch_related('songs', 'dress_details', 'participants__user').order_by('date', 'time')
+
+
+def delete_bench_events(run_id):
+    Event.objects.filter(place__startswith=f'Bench {run_id}').delete()
+    User.objects.filter(username__startswith=f'bench-events-{run_id}-').delete()
@@ -0,0 +1,50 @@
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.middleware.gzip import GZipMiddleware
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+
+from events.serializers import EventSerializer
+from quran_events_backend.compression import brotli
+
+from ._bench_events import delete_bench_events, seed_bench_events, timed
+
+
+class Command(BaseCommand):
+    """Compare wire size and CPU cost of gzip and Brotli on event list payloads"""
+    help = 'Benchmark response compression on realistic EventSerializer pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=200, help='Throwaway events to generate (default: 200)')
+        parser.add_argument('--participants', type=int, default=8, help='Participants per event (default: 8)')
+        parser.add_argument('--repeat', type=int, default=20, help='Timing runs per measurement (default: 20)')
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        try:
+            queryset = seed_bench_events(run_id, options['events'], options['participants'])
+
+            codecs = [('gzip-6', lambda body: compress_string(body, max_random_bytes=GZipMiddleware.max_random_bytes))]
+            if brotli is not None:
+                codecs += [
+                    (f'br-{quality}', lambda body, quality=quality: brotli.compress(body, quality=quality))
+                    for quality in (1, 4, 11)
+                ]
+            else:
+                self.stdout.write(self.style.WARNING('brotli is not installed; measuring gzip only'))
+
+            for size in (20, 100, options['events']):
+                events = list(queryset[:size])
+                render_ms, body = timed(
+                    lambda: JSONRenderer().render(EventSerializer(events, many=True).data), options['repeat']
+                )
+                self.stdout.write(f'\n{len(events)} events: {len(body):,} bytes of JSON, serialized in {render_ms:.2f} ms')
+                for name, compress in codecs:
+                    compress_ms, compressed = timed(lambda: compress(body), options['repeat'])
+                    self.stdout.write(
+                        f'  {name:>7}: {len(compressed):>9,} bytes ({len(compressed) / len(body):6.1%}), '
+                        f'{compress_ms:7.2f} ms ({compress_ms / render_ms:5.1%} of serialization)'
+                    )
+        finally:
+            delete_bench_events(run_id)
@@ -0,0 +1,70 @@
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from events.documents import DOCUMENT_ROW_FIELDS, events_json
+from events.fast_serializers import event_values, serialize_events
+from events.models import EventDocument
+from events.serializers import EventSerializer
+
+from ._bench_events import delete_bench_events, seed_bench_events, timed
+
+
+class Command(BaseCommand):
+    """Compare EventSerializer with the values()-based fast path and stored documents on the same events"""
+    help = 'Benchmark EventSerializer against events.fast_serializers and events.documents, queries included'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=1000, help='Throwaway events to generate (default: 1000)')
+        parser.add_argument('--participants', type=int, default=8, help='Participants per event (default: 8)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timing runs per measurement (default: 5)')
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        repeat = options['repeat']
+        try:
+            queryset = seed_bench_events(run_id, options['events'], options['participants'])
+            # The seed bypasses the signals that keep documents current
+            EventDocument.rebuild(queryset.values_list('id', flat=True))
+            rows = queryset.prefetch_related(None).values(*DOCUMENT_ROW_FIELDS)
+            for size in (20, options['events']):
+                with CaptureQueriesContext(connection) as model_queries:
+                    model_ms, model_data = timed(lambda: EventSerializer(queryset[:size], many=True).data, repeat)
+                annotated = queryset.prefetch_related(None).with_computed_fields().with_children()
+                with CaptureQueriesContext(connection) as annotated_queries:
+                    annotated_ms, annotated_data = timed(
+                        lambda: EventSerializer(annotated[:size], many=True).data, repeat
+                    )
+                with CaptureQueriesContext(connection) as fast_queries:
+                    fast_ms, fast_data = timed(lambda: serialize_events(event_values(queryset)[:size]), repeat)
+                with CaptureQueriesContext(connection) as document_queries:
+                    # Already rendered, so the JSON rendering the others still need is included
+                    document_ms, document_body = timed(lambda: events_json(rows[:size]), repeat)
+
+                expected = JSONRenderer().render(model_data)
+                if JSONRenderer().render(annotated_data) != expected or JSONRenderer().render(fast_data) != expected:
+                    raise CommandError('The annotated or fast serializer output differs from EventSerializer')
+                if document_body != expected:
+                    raise CommandError('The spliced documents differ from EventSerializer')
+
+                self.stdout.write(f'{size} events (identical output):')
+                self.stdout.write(
+                    f'  EventSerializer:  {model_ms:8.2f} ms, {len(model_queries) // repeat} queries'
+                )
+                self.stdout.write(
+                    f'  ... annotated:    {annotated_ms:8.2f} ms, {len(annotated_queries) // repeat} queries '
+                    f'({model_ms / annotated_ms:.1f}x faster)'
+                )
+                self.stdout.write(
+                    f'  fast_serializers: {fast_ms:8.2f} ms, {len(fast_queries) // repeat} queries '
+                    f'({model_ms / fast_ms:.1f}x faster)'
+                )
+                self.stdout.write(
+                    f'  documents:        {document_ms:8.2f} ms, {len(document_queries) // repeat} queries '
+                    f'({model_ms / document_ms:.1f}x faster, rendered JSON)'
+                )
+        finally:
+            delete_bench_events(run_id)
@@ -0,0 +1,53 @@
+import io
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from events.serializers import EventSerializer
+from quran_events_backend.parsers import ORJSONParser
+from quran_events_backend.renderers import ORJSONRenderer, orjson
+
+from ._bench_events import delete_bench_events, seed_bench_events, timed
+
+
+class Command(BaseCommand):
+    """Compare the stdlib and orjson renderers and parsers on an event list payload"""
+    help = 'Benchmark JSON rendering and parsing of 1,000 serialized events'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=1000, help='Throwaway events to generate (default: 1000)')
+        parser.add_argument('--participants', type=int, default=8, help='Participants per event (default: 8)')
+        parser.add_argument('--repeat', type=int, default=10, help='Timing runs per measurement (default: 10)')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError('orjson is not installed; ORJSONRenderer falls back to the stdlib renderer')
+
+        run_id = uuid.uuid4().hex[:8]
+        repeat = options['repeat']
+        try:
+            events = list(seed_bench_events(run_id, options['events'], options['participants']))
+            serialize_ms, data = timed(lambda: EventSerializer(events, many=True).data, repeat)
+        finally:
+            delete_bench_events(run_id)
+
+        stdlib_ms, stdlib_body = timed(lambda: JSONRenderer().render(data), repeat)
+        orjson_ms, orjson_body = timed(lambda: ORJSONRenderer().render(data), repeat)
+        if stdlib_body != orjson_body:
+            raise CommandError('ORJSONRenderer output differs from JSONRenderer')
+
+        stdlib_parse_ms, _ = timed(lambda: JSONParser().parse(io.BytesIO(stdlib_body)), repeat)
+        orjson_parse_ms, _ = timed(lambda: ORJSONParser().parse(io.BytesIO(stdlib_body)), repeat)
+
+        self.stdout.write(f'{len(events)} events, {len(stdlib_body):,} bytes (identical output)')
+        self.stdout.write(f'  serializer.data:      {serialize_ms:8.2f} ms')
+        self.stdout.write(f'  render, stdlib json:  {stdlib_ms:8.2f} ms')
+        self.stdout.write(f'  render, orjson:       {orjson_ms:8.2f} ms  ({stdlib_ms / orjson_ms:.1f}x faster)')
+        self.stdout.write(f'  parse, stdlib json:   {stdlib_parse_ms:8.2f} ms')
+        self.stdout.write(f'  parse, orjson:        {orjson_parse_ms:8.2f} ms  ({stdlib_parse_ms / orjson_parse_ms:.1f}x faster)')
+        self.stdout.write(
+            f'  render share of a response: {stdlib_ms / (serialize_ms + stdlib_ms):.0%} -> '
+            f'{orjson_ms / (serialize_ms + orjson_ms):.0%}'
+        )
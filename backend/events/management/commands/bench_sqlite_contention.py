@@ -0,0 +1,109 @@
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+
+CONFIGURATIONS = {
+    # Django's stock backend: rollback journal, deferred transactions
+    'baseline': {'ENGINE': 'django.db.backends.sqlite3', 'OPTIONS': {}},
+    # The tuned backend with whatever pragmas the default database is configured with
+    'tuned': None,
+}
+
+
+def run_worker(alias, duration, write_ratio, seed, results):
+    """Mix reads and read-then-write transactions until the deadline"""
+    rng = random.Random(seed)
+    counts = {'reads': 0, 'writes': 0, 'locked': 0}
+    connection = connections[alias]
+    deadline = time.monotonic() + duration
+    try:
+        while time.monotonic() < deadline:
+            try:
+                if rng.random() < write_ratio:
+                    # Same shape as a join: read the counter, then write it
+                    counter_id = rng.randint(1, 10)
+                    with transaction.atomic(using=alias):
+                        with connection.cursor() as cursor:
+                            cursor.execute('SELECT value FROM bench_counter WHERE id = %s', [counter_id])
+                            cursor.fetchone()
+                            cursor.execute('UPDATE bench_counter SET value = value + 1 WHERE id = %s', [counter_id])
+                            cursor.execute('INSERT INTO bench_log (counter_id, payload) VALUES (%s, %s)', [counter_id, 'x' * 64])
+                    counts['writes'] += 1
+                else:
+                    with connection.cursor() as cursor:
+                        cursor.execute('SELECT COUNT(*), SUM(value) FROM bench_counter')
+                        cursor.fetchone()
+                        cursor.execute('SELECT COUNT(*) FROM bench_log WHERE counter_id = %s', [rng.randint(1, 10)])
+                        cursor.fetchone()
+                    counts['reads'] += 1
+            except OperationalError:
+                counts['locked'] += 1
+    finally:
+        connection.close()
+    results.put(counts)
+
+
+class Command(BaseCommand):
+    """Compare stock and tuned SQLite under concurrent multi-process reads and writes"""
+    help = 'Benchmark SQLite read/write contention across processes, before and after the connection pragmas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=6, help='Concurrent worker processes (default: 6)')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds each configuration runs (default: 5)')
+        parser.add_argument('--write-ratio', type=float, default=0.3, help='Share of operations that write (default: 0.3)')
+
+    def handle(self, *args, **options):
+        default = connections['default'].settings_dict
+        if default['ENGINE'] != 'quran_events_backend.db_backends.sqlite3':
+            raise CommandError('The default database does not use the tuned SQLite backend')
+
+        workdir = tempfile.mkdtemp(prefix='bench-sqlite-')
+        try:
+            for name, overrides in CONFIGURATIONS.items():
+                alias = f'bench_{name}'
+                config = {**default, **(overrides or {}), 'NAME': os.path.join(workdir, f'{name}.sqlite3')}
+                connections.settings[alias] = config
+                self.prepare(alias)
+                counts = self.run(alias, options)
+                self.report(name, counts, options['duration'])
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def prepare(self, alias):
+        with connections[alias].cursor() as cursor:
+            cursor.execute('CREATE TABLE bench_counter (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)')
+            cursor.execute('CREATE TABLE bench_log (id INTEGER PRIMARY KEY, counter_id INTEGER NOT NULL, payload TEXT)')
+            cursor.execute('CREATE INDEX bench_log_counter ON bench_log (counter_id)')
+            cursor.executemany('INSERT INTO bench_counter (id, value) VALUES (%s, 0)', [(i,) for i in range(1, 11)])
+        # Workers are forked; none of them may inherit an open connection
+        connections.close_all()
+
+    def run(self, alias, options):
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        workers = [
+            context.Process(target=run_worker, args=(alias, options['duration'], options['write_ratio'], seed, results))
+            for seed in range(options['processes'])
+        ]
+        for worker in workers:
+            worker.start()
+        totals = {'reads': 0, 'writes': 0, 'locked': 0}
+        for _ in workers:
+            for key, value in results.get().items():
+                totals[key] += value
+        for worker in workers:
+            worker.join()
+        return totals
+
+    def report(self, name, counts, duration):
+        operations = counts['reads'] + counts['writes']
+        self.stdout.write(
+            f'{name:>8}: {operations / duration:8.0f} ops/s '
+            f'({counts["reads"]} reads, {counts["writes"]} writes, {counts["locked"]} "database is locked" errors)'
+        )
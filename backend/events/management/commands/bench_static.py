@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponseNotFound
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.views.static import serve
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+MANIFEST_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+
+class Command(BaseCommand):
+    """Time collectstatic with the production storage and static serving through WhiteNoise"""
+    help = 'Benchmark collectstatic and /static/ throughput with WhiteNoise and compressed manifest storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file', default='admin/css/base.css', help='Static file to request (default: admin/css/base.css)'
+        )
+        parser.add_argument('--requests', type=int, default=500, help='Requests per measurement (default: 500)')
+
+    def handle(self, *args, **options):
+        static_root = tempfile.mkdtemp(prefix='bench-static-')
+        storages = {
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': MANIFEST_STORAGE},
+        }
+        try:
+            with override_settings(STATIC_ROOT=static_root, STORAGES=storages):
+                started = time.perf_counter()
+                call_command('collectstatic', interactive=False, verbosity=0)
+                collect_seconds = time.perf_counter() - started
+                self.report_collectstatic(static_root, collect_seconds)
+
+                try:
+                    hashed_name = staticfiles_storage.stored_name(options['file'])
+                except ValueError:
+                    raise CommandError(f"{options['file']} is not a static file")
+                self.report_serving(static_root, options['file'], hashed_name, options['requests'])
+        finally:
+            shutil.rmtree(static_root, ignore_errors=True)
+
+    def report_collectstatic(self, static_root, seconds):
+        sizes = {'': 0, '.gz': 0, '.br': 0}
+        counts = dict.fromkeys(sizes, 0)
+        for directory, _, filenames in os.walk(static_root):
+            for filename in filenames:
+                suffix = os.path.splitext(filename)[1] if filename.endswith(('.gz', '.br')) else ''
+                counts[suffix] += 1
+                sizes[suffix] += os.path.getsize(os.path.join(directory, filename))
+        self.stdout.write(f'collectstatic ({MANIFEST_STORAGE}): {seconds:.2f}s')
+        self.stdout.write(f'  files (originals and hashed copies): {counts[""]:>5}, {sizes[""]:>11,} bytes')
+        self.stdout.write(f'  gzip copies:                         {counts[".gz"]:>5}, {sizes[".gz"]:>11,} bytes')
+        self.stdout.write(f'  Brotli copies:                       {counts[".br"]:>5}, {sizes[".br"]:>11,} bytes')
+
+    def report_serving(self, static_root, name, hashed_name, requests):
+        # Built now, the middleware indexes the temporary STATIC_ROOT; both it and
+        # serve() are called directly, without the rest of the middleware stack
+        whitenoise = WhiteNoiseMiddleware(lambda request: HttpResponseNotFound())
+        factory = RequestFactory()
+        self.stdout.write(f'\nGET /static/{hashed_name}, {requests} requests per row:')
+
+        def fetch(url, encoding):
+            response = whitenoise(factory.get(url, HTTP_ACCEPT_ENCODING=encoding))
+            body = b''.join(response.streaming_content)
+            response.close()
+            return response, body
+
+        for label, url, encoding in (
+            ('WhiteNoise, identity', f'/static/{hashed_name}', ''),
+            ('WhiteNoise, gzip', f'/static/{hashed_name}', 'gzip'),
+            ('WhiteNoise, br', f'/static/{hashed_name}', 'gzip, deflate, br'),
+        ):
+            response, body = fetch(url, encoding)
+            if response.status_code != 200:
+                raise CommandError(f'{url} returned {response.status_code}')
+            seconds = self.time_requests(lambda: fetch(url, encoding), requests)
+            self.stdout.write(
+                f'  {label:<28} {requests / seconds:8.0f} req/s, {len(body):>7,} bytes, '
+                f"{response.get('Content-Encoding', 'identity')}, Cache-Control: {response['Cache-Control']}"
+            )
+
+        def django_serve():
+            response = serve(factory.get(f'/static/{name}'), name, document_root=static_root)
+            body = b''.join(response.streaming_content)
+            response.close()
+            return response, body
+
+        _, body = django_serve()
+        seconds = self.time_requests(django_serve, requests)
+        self.stdout.write(
+            f"  {'django.views.static.serve':<28} {requests / seconds:8.0f} req/s, {len(body):>7,} bytes, "
+            f'identity, no Cache-Control'
+        )
+
+    @staticmethod
+    def time_requests(fetch, requests):
+        started = time.perf_counter()
+        for _ in range(requests):
+            fetch()
+        return time.perf_counter() - started
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from events.documents import render_documents
+from events.models import Event, EventDocument, event_data_changed
+
+
+class Command(BaseCommand):
+    """Compare every stored event document with a fresh rendering of the event"""
+    help = 'Report missing, stale and orphaned event documents; --fix rebuilds or removes them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=EventDocument.REBUILD_BATCH_SIZE,
+            help=f'Events compared per query batch (default: {EventDocument.REBUILD_BATCH_SIZE})',
+        )
+        parser.add_argument('--fix', action='store_true', help='Rebuild missing and stale documents, delete orphans')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        missing, stale = [], []
+        event_ids = list(Event.objects.order_by('id').values_list('id', flat=True))
+        for start in range(0, len(event_ids), batch_size):
+            batch = event_ids[start:start + batch_size]
+            stored = dict(EventDocument.objects.filter(event_id__in=batch).values_list('event_id', 'body'))
+            for event_id, body in render_documents(batch).items():
+                if event_id not in stored:
+                    missing.append(event_id)
+                elif stored[event_id] != body:
+                    stale.append(event_id)
+        orphaned = EventDocument.objects.exclude(event_id__in=Event.objects.values('id'))
+        orphaned_ids = list(orphaned.values_list('event_id', flat=True))
+
+        self.stdout.write(f'{len(event_ids)} events checked')
+        for label, ids in (('missing', missing), ('stale', stale), ('orphaned', orphaned_ids)):
+            self.stdout.write(f'  {label}: {len(ids)}' + (f' (events {self.sample(ids)})' if ids else ''))
+
+        if not (missing or stale or orphaned_ids):
+            self.stdout.write(self.style.SUCCESS('All event documents are consistent'))
+            return
+        if not options['fix']:
+            raise CommandError('Event documents are inconsistent; run with --fix to repair them')
+
+        broken = missing + stale
+        for start in range(0, len(broken), batch_size):
+            with transaction.atomic():
+                event_data_changed(broken[start:start + batch_size])
+        orphaned.delete()
+        self.stdout.write(self.style.SUCCESS(f'Repaired {len(broken) + len(orphaned_ids)} event documents'))
+
+    @staticmethod
+    def sample(ids, limit=10):
+        shown = ', '.join(str(event_id) for event_id in ids[:limit])
+        return shown + (f' and {len(ids) - limit} more' if len(ids) > limit else '')
@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from events.models import Event
+
+
+class Command(BaseCommand):
+    """Mark pending and confirmed events whose date has passed as completed"""
+    help = 'Transition past pending/confirmed events to completed in small batches'
+
+    OPEN_STATUSES = ['pending', 'confirmed']
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Maximum number of events updated per transaction (default: 200)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.05,
+            help='Seconds to sleep between batches so other writers can get the lock (default: 0.05)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many events would be transitioned',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        today = timezone.now().date()
+        past_open_events = Event.objects.filter(date__lt=today, status__in=self.OPEN_STATUSES)
+
+        if options['dry_run']:
+            self.stdout.write(f'{past_open_events.count()} past events would be marked completed')
+            return
+
+        transitioned = 0
+        batches = 0
+        while True:
+            event_ids = list(past_open_events.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not event_ids:
+                break
+
+            # One short transaction per batch keeps the SQLite write lock brief
+            with transaction.atomic():
+                batch = Event.objects.filter(id__in=event_ids, status__in=self.OPEN_STATUSES)
+                transitioned += len(Event.bulk_update_status(batch, 'completed'))
+            batches += 1
+
+            if len(event_ids) < batch_size:
+                break
+            time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Marked {transitioned} past events as completed in {batches} batches'
+        ))
@@ -0,0 +1,93 @@
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.utils import timezone
+
+from events.models import AlreadyJoinedError, Event, EventFullError, EventParticipant
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Hammer join_event with concurrent requests and verify the participant counter"""
+    help = 'Run concurrent joins against a throwaway event and check participants_count stays exact'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=300, help='Number of distinct users joining (default: 300)')
+        parser.add_argument('--capacity', type=int, default=100, help='number_of_participants of the event, 0 = unlimited (default: 100)')
+        parser.add_argument('--attempts', type=int, default=2, help='Join attempts per user, >1 exercises duplicates (default: 2)')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated event and users afterwards')
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        User.objects.bulk_create([
+            User(username=f'loadtest-{run_id}-{i}', first_name='Load', last_name=f'Test {i}', password='!')
+            for i in range(options['users'])
+        ])
+        users = list(User.objects.filter(username__startswith=f'loadtest-{run_id}-'))
+        event = Event.objects.create(
+            day='Friday',
+            date=timezone.now().date() + timedelta(days=30),
+            time=timezone.now().time().replace(microsecond=0),
+            duration=60,
+            place=f'Load test {run_id}',
+            number_of_participants=options['capacity'],
+            created_by=users[0],
+        )
+
+        results = {'joined': 0, 'already_joined': 0, 'full': 0, 'error': 0}
+        lock = threading.Lock()
+        start = threading.Barrier(len(users) + 1)
+
+        def worker(user):
+            start.wait()
+            try:
+                for _ in range(options['attempts']):
+                    try:
+                        EventParticipant.join(event.pk, user)
+                        outcome = 'joined'
+                    except AlreadyJoinedError:
+                        outcome = 'already_joined'
+                    except EventFullError:
+                        outcome = 'full'
+                    except Exception:
+                        outcome = 'error'
+                    with lock:
+                        results[outcome] += 1
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        started = time.perf_counter()
+        start.wait()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        event.refresh_from_db()
+        actual = EventParticipant.objects.filter(event=event).count()
+        capacity = options['capacity']
+
+        self.stdout.write(f'Database vendor: {connection.vendor}')
+        self.stdout.write(f'{len(users)} users x {options["attempts"]} attempts in {elapsed:.2f}s')
+        for outcome, count in results.items():
+            self.stdout.write(f'  {outcome}: {count}')
+        self.stdout.write(f'participants_count={event.participants_count} rows={actual} capacity={capacity or "unlimited"}')
+
+        consistent = event.participants_count == actual == results['joined']
+        within_capacity = not capacity or actual <= capacity
+        if not options['keep']:
+            event.delete()
+            User.objects.filter(username__startswith=f'loadtest-{run_id}-').delete()
+
+        if consistent and within_capacity:
+            self.stdout.write(self.style.SUCCESS('Counter is consistent'))
+        else:
+            self.stdout.write(self.style.ERROR('Counter drifted from the participant rows'))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from events.models import Event, EventDocument, event_data_changed
+
+
+class Command(BaseCommand):
+    """Render the stored JSON document of every event again"""
+    help = 'Rebuild all event documents (after deploying serializer changes or restoring a backup)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=EventDocument.REBUILD_BATCH_SIZE,
+            help=f'Events rebuilt per transaction (default: {EventDocument.REBUILD_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.05,
+            help='Seconds to sleep between batches so other writers can get the lock (default: 0.05)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        started = time.perf_counter()
+        event_ids = list(Event.objects.order_by('id').values_list('id', flat=True))
+        for start in range(0, len(event_ids), batch_size):
+            if start:
+                time.sleep(options['pause'])
+            with transaction.atomic():
+                event_data_changed(event_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {len(event_ids)} event documents in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from quran_events_backend.response_cache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    """Print the API response cache hit/miss counters"""
+    help = 'Show (and optionally reset) response cache hits, misses, stale responses and hit ratio'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        self.stdout.write(f'hits: {stats["hits"]}')
+        self.stdout.write(f'misses: {stats["misses"]}')
+        self.stdout.write(f'stale: {stats["stale"]}')
+        self.stdout.write(f'hit ratio: {stats["hit_ratio"]:.1%}')
+        if options['reset']:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:35
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_participants_count(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    counts = Event.objects.annotate(count=Count('participants')).filter(count__gt=0).values_list('id', 'count')
+    for event_id, count in counts:
+        Event.objects.filter(id=event_id).update(participants_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_remove_event_dress_details_event_event_reason_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='participants_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of users currently participating (maintained automatically)'),
+        ),
+        migrations.RunPython(backfill_participants_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_event_participants_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventparticipant',
+            index=models.Index(fields=['event', 'id'], name='event_participants_event_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_event_participants_event_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventparticipant',
+            index=models.Index(fields=['user', 'event'], name='event_participants_user_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:12
+
+from django.db import migrations
+
+# Expression indexes matching the SQL Django emits for icontains on
+# PostgreSQL (UPPER("col"::text) LIKE UPPER(...)), so substring searches on
+# place and event_reason use a trigram index instead of a sequential scan.
+TRIGRAM_INDEXES = {
+    'events_place_trgm_idx': 'place',
+    'events_event_reason_trgm_idx': 'event_reason',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON events USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_event_participants_user_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_event_search_trgm_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventDocument',
+            fields=[
+                ('event', models.OneToOneField(help_text='Event this document renders', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='events.event')),
+                ('body', models.TextField(help_text='Event JSON without is_upcoming and is_past')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Event Document',
+                'verbose_name_plural': 'Event Documents',
+                'db_table': 'event_documents',
+            },
+        ),
+    ]
@@ -1,11 +1,121 @@
-from django.db import models
+from django.db import connection, connections, models, router, transaction
+from django.db.models import BooleanField, Count, ExpressionWrapper, F, OuterRef, Prefetch, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Concat, Greatest, Trim
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.core.cache import cache
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from quran_events_backend.response_cache import get_tag_versions, invalidate_tags
+from quran_events_backend.single_flight import single_flight
+
 User = get_user_model()
 
 
-class Event(models.Model):
+def invalidate_event_responses(event_ids):
+    """Drop cached responses for these events and every event listing"""
+    invalidate_tags('events:list', *(f'event:{event_id}' for event_id in event_ids))
+
+
+class _PendingDocumentRebuild:
+    """on_commit callback rebuilding each event changed in a transaction once"""
+    
+    def __init__(self):
+        self.event_ids = set()
+        self.done = False
+    
+    def __call__(self):
+        self.done = True
+        EventDocument.rebuild(sorted(self.event_ids))
+
+
+def event_data_changed(event_ids):
+    """Rebuild the stored documents of these events and drop their cached responses.
+    
+    Inside a transaction the ids are collected and every event is rebuilt
+    once when it commits, however many of its rows the transaction wrote;
+    nothing is rebuilt if it rolls back. The rebuild is registered before
+    the on-commit cache invalidation, so responses rebuilt after the
+    invalidation read the new documents.
+    """
+    using = router.db_for_write(EventDocument)
+    db_connection = connections[using]
+    if not db_connection.in_atomic_block:
+        EventDocument.rebuild(event_ids)
+    else:
+        pending = getattr(db_connection, '_pending_document_rebuild', None)
+        # A rolled back transaction or savepoint drops the callback with it
+        if pending is None or pending.done or not any(func is pending for _, func, _ in db_connection.run_on_commit):
+            pending = db_connection._pending_document_rebuild = _PendingDocumentRebuild()
+            # A failed rebuild leaves stale documents for check_event_documents, not a 500 for a committed write
+            transaction.on_commit(pending, using=using, robust=True)
+        pending.event_ids.update(event_ids)
+    invalidate_event_responses(event_ids)
+
+
+class AlreadyJoinedError(Exception):
+    """Raised when a user joins an event they already participate in"""
+
+
+class EventFullError(Exception):
+    """Raised when an event has reached its number_of_participants capacity"""
+
+
+def full_name_expression(prefix):
+    """SQL for AbstractUser.get_full_name() of the user at prefix"""
+    return Trim(Concat(f'{prefix}first_name', Value(' '), f'{prefix}last_name'))
+
+
+class EventQuerySet(models.QuerySet):
+    """Event queries with the serializers' computed fields done in SQL"""
+    
+    def with_computed_fields(self, today=None):
+        """Annotate is_upcoming, is_past and created_by_name.
+        
+        today defaults to the current date, taken once for the whole query.
+        participants_count needs no annotation: it is a maintained column.
+        """
+        if today is None:
+            today = timezone.now().date()
+        return self.annotate(
+            is_upcoming=ExpressionWrapper(Q(date__gte=today), output_field=BooleanField()),
+            is_past=ExpressionWrapper(Q(date__lt=today), output_field=BooleanField()),
+            created_by_name=full_name_expression('created_by__'),
+        )
+    
+    def with_children(self):
+        """Prefetch songs, dress details and participants with their user_name annotated"""
+        return self.prefetch_related(
+            'songs',
+            'dress_details',
+            Prefetch('participants', queryset=EventParticipant.objects.with_user_name()),
+            # Prefetched rather than joined: one instance per distinct user
+            'participants__user',
+        )
+
+
+class EventDataModel(models.Model):
+    """Base of Event and its children.
+    
+    save() and delete() run in a transaction, so the EventDocument rebuild
+    their signals schedule (events.signals) runs once the write committed.
+    """
+    
+    class Meta:
+        abstract = True
+    
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+    
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            return super().delete(using=using, keep_parents=keep_parents)
+
+
+class Event(EventDataModel):
     """Quran Event model"""
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -27,6 +137,11 @@ class Event(models.Model):
         default=0,
         help_text="Expected number of participants"
     )
+    participants_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of users currently participating (maintained automatically)"
+    )
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
@@ -80,6 +195,8 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = EventQuerySet.as_manager()
+    
     class Meta:
         db_table = 'events'
         verbose_name = 'Event'
@@ -89,19 +206,75 @@ class Event(models.Model):
     def __str__(self):
         return f"{self.day} Event - {self.date} at {self.place}"
     
+    # is_upcoming and is_past come from EventQuerySet.with_computed_fields()
+    # when annotated; the annotation is kept with the date it was computed
+    # for, so an event whose date changed since it was loaded is recomputed.
+    
     @property
     def is_upcoming(self):
         """Check if event is in the future"""
-        from django.utils import timezone
+        annotated = self.__dict__.get('_annotated_is_upcoming')
+        if annotated is not None and annotated[0] == self.date:
+            return annotated[1]
         return self.date >= timezone.now().date()
     
+    @is_upcoming.setter
+    def is_upcoming(self, value):
+        self._annotated_is_upcoming = (self.date, value)
+    
     @property
     def is_past(self):
         """Check if event is in the past"""
+        annotated = self.__dict__.get('_annotated_is_past')
+        if annotated is not None and annotated[0] == self.date:
+            return annotated[1]
         return not self.is_upcoming
+    
+    @is_past.setter
+    def is_past(self, value):
+        self._annotated_is_past = (self.date, value)
+    
+    @classmethod
+    def bulk_update_status(cls, queryset, new_status):
+        """Move every event in the queryset to new_status with a single UPDATE.
+        
+        Call this inside a transaction: the cached EventStats counters are
+        shifted in the same transaction. Returns the ids of all matched events.
+        """
+        rows = list(queryset.select_for_update().values_list('id', 'status'))
+        event_ids = [event_id for event_id, _ in rows]
+        
+        changes = {}
+        for _, old_status in rows:
+            if old_status != new_status:
+                changes[old_status] = changes.get(old_status, 0) + 1
+        
+        if changes:
+            cls.objects.filter(id__in=event_ids).exclude(status=new_status).update(
+                status=new_status,
+                updated_at=timezone.now()
+            )
+            EventStats.record_status_changes(changes, new_status)
+            event_data_changed(event_ids)
+        
+        return event_ids
+    
+    @classmethod
+    def sync_participants_count(cls, event_ids):
+        """Recount participants_count from the event_participants rows.
+        
+        Call this inside a transaction, like bulk_update_status().
+        """
+        participant_count = EventParticipant.objects.filter(
+            event=OuterRef('pk')
+        ).order_by().values('event').annotate(count=Count('id')).values('count')
+        cls.objects.filter(id__in=event_ids).update(
+            participants_count=Coalesce(Subquery(participant_count), 0)
+        )
+        event_data_changed(event_ids)
 
 
-class Song(models.Model):
+class Song(EventDataModel):
     """Songs used in events"""
     event = models.ForeignKey(
         Event,
@@ -133,7 +306,7 @@ class Song(models.Model):
         return f"{self.title} - {self.event}"
 
 
-class DressDetail(models.Model):
+class DressDetail(EventDataModel):
     """Dress details for events"""
     event = models.ForeignKey(
         Event,
@@ -159,7 +332,14 @@ class DressDetail(models.Model):
         return f"{self.description} - {self.event}"
 
 
-class EventParticipant(models.Model):
+class EventParticipantQuerySet(models.QuerySet):
+    
+    def with_user_name(self):
+        """Annotate user_name, the participant's full name"""
+        return self.annotate(user_name=full_name_expression('user__'))
+
+
+class EventParticipant(EventDataModel):
     """Event participants"""
     event = models.ForeignKey(
         Event,
@@ -176,18 +356,171 @@ class EventParticipant(models.Model):
     joined_at = models.DateTimeField(auto_now_add=True)
     is_confirmed = models.BooleanField(default=False, help_text="Participation confirmed")
     
+    objects = EventParticipantQuerySet.as_manager()
+    
     class Meta:
         db_table = 'event_participants'
         verbose_name = 'Event Participant'
         verbose_name_plural = 'Event Participants'
         unique_together = ['event', 'user']
+        indexes = [
+            models.Index(fields=['event', 'id'], name='event_participants_event_idx'),
+            models.Index(fields=['user', 'event'], name='event_participants_user_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.event}"
+    
+    @classmethod
+    def join(cls, event_id, user):
+        """Add user to the event without exceeding its capacity.
+        
+        An event with number_of_participants set to 0 has no capacity limit.
+        The happy path is one guarded UPDATE of the counter plus one
+        INSERT ... ON CONFLICT DO NOTHING, both in the same transaction, so
+        concurrent joins can neither overfill the event nor double count.
+        
+        Returns a dict with the new participant's id and joined_at.
+        Raises Event.DoesNotExist, AlreadyJoinedError or EventFullError.
+        """
+        joined_at = timezone.now()
+        table = connection.ops.quote_name(cls._meta.db_table)
+        
+        with transaction.atomic():
+            reserved = Event.objects.filter(
+                Q(number_of_participants=0) | Q(participants_count__lt=F('number_of_participants')),
+                pk=event_id,
+            ).update(participants_count=F('participants_count') + 1)
+            
+            if not reserved:
+                if not Event.objects.filter(pk=event_id).exists():
+                    raise Event.DoesNotExist
+                if cls.objects.filter(event_id=event_id, user=user).exists():
+                    raise AlreadyJoinedError
+                raise EventFullError
+            
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {table} (event_id, user_id, joined_at, is_confirmed) '
+                    f'VALUES (%s, %s, %s, %s) '
+                    f'ON CONFLICT (event_id, user_id) DO NOTHING RETURNING id',
+                    [event_id, user.pk, connection.ops.adapt_datetimefield_value(joined_at), False]
+                )
+                row = cursor.fetchone()
+            
+            if row is None:
+                # Roll back the counter increment as well
+                raise AlreadyJoinedError
+            
+            event_data_changed([event_id])
+        
+        return {'id': row[0], 'joined_at': joined_at}
+    
+    @classmethod
+    def add_many(cls, event_id, user_ids):
+        """Add the users who do not participate yet, all or none within capacity.
+        
+        Like join(), the counter is reserved with one guarded UPDATE before
+        inserting, so concurrent joins cannot overfill the event either.
+        Returns the ids of the users added. Raises EventFullError when they
+        do not all fit.
+        """
+        with transaction.atomic():
+            existing = set(cls.objects.filter(event_id=event_id, user_id__in=user_ids).values_list('user_id', flat=True))
+            new_user_ids = [user_id for user_id in dict.fromkeys(user_ids) if user_id not in existing]
+            if not new_user_ids:
+                return []
+            
+            reserved = Event.objects.filter(
+                Q(number_of_participants=0)
+                | Q(participants_count__lte=F('number_of_participants') - len(new_user_ids)),
+                pk=event_id,
+            ).update(participants_count=F('participants_count') + len(new_user_ids))
+            if not reserved:
+                raise EventFullError
+            
+            cls.objects.bulk_create(
+                [cls(event_id=event_id, user_id=user_id) for user_id in new_user_ids],
+                ignore_conflicts=True
+            )
+            # A concurrent join of one of these users makes the reservation overcount
+            Event.sync_participants_count([event_id])
+        
+        return new_user_ids
+    
+    @classmethod
+    def leave(cls, event_id, user):
+        """Remove user from the event and release their place.
+        
+        Raises Event.DoesNotExist or cls.DoesNotExist when there is nothing to remove.
+        """
+        with transaction.atomic():
+            deleted, _ = cls.objects.filter(event_id=event_id, user=user).delete()
+            if not deleted:
+                if not Event.objects.filter(pk=event_id).exists():
+                    raise Event.DoesNotExist
+                raise cls.DoesNotExist
+            
+            Event.objects.filter(pk=event_id, participants_count__gt=0).update(
+                participants_count=F('participants_count') - 1
+            )
+            event_data_changed([event_id])
+
+
+class EventDocument(models.Model):
+    """Stored EventSerializer JSON of one event, songs, dress details and participants included.
+    
+    The list and detail endpoints splice these bodies together instead of
+    serializing events per request (see events.documents). Bodies leave out
+    is_upcoming and is_past, which depend on the day they are read.
+    """
+    event = models.OneToOneField(
+        Event,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='document',
+        help_text="Event this document renders"
+    )
+    body = models.TextField(help_text="Event JSON without is_upcoming and is_past")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    REBUILD_BATCH_SIZE = 500
+    
+    class Meta:
+        db_table = 'event_documents'
+        verbose_name = 'Event Document'
+        verbose_name_plural = 'Event Documents'
+    
+    def __str__(self):
+        return f"Document of event {self.event_id}"
+    
+    @classmethod
+    def rebuild(cls, event_ids):
+        """Render and upsert the documents of these events; drop those of deleted events"""
+        from .documents import render_documents
+        
+        event_ids = list(event_ids)
+        with transaction.atomic(using=router.db_for_write(cls)):
+            for start in range(0, len(event_ids), cls.REBUILD_BATCH_SIZE):
+                batch = event_ids[start:start + cls.REBUILD_BATCH_SIZE]
+                bodies = render_documents(batch)
+                cls.objects.bulk_create(
+                    [cls(event_id=event_id, body=body) for event_id, body in bodies.items()],
+                    update_conflicts=True,
+                    unique_fields=['event'],
+                    update_fields=['body', 'updated_at'],
+                )
+                gone = [event_id for event_id in batch if event_id not in bodies]
+                if gone:
+                    cls.objects.filter(event_id__in=gone).delete()
 
 
 class EventStats(models.Model):
     """Event statistics for dashboard"""
+    # Response cache tags the counters are derived from
+    SOURCE_TAGS = ('events:list', 'users')
+    VERSIONS_CACHE_KEY = 'event-stats:versions'
+
     total_events = models.PositiveIntegerField(default=0)
     pending_events = models.PositiveIntegerField(default=0)
     confirmed_events = models.PositiveIntegerField(default=0)
@@ -220,6 +553,41 @@ class EventStats(models.Model):
         )
         return stats
     
+    @classmethod
+    def get_current_stats(cls):
+        """Statistics record, recounted only when events or users changed since the last count.
+        
+        Concurrent callers share one recount: the first one takes the
+        single-flight lock and runs update_stats(), the others wait for it
+        and read the record it saved.
+        """
+        stats = cls.get_or_create_stats()
+        if cache.get(cls.VERSIONS_CACHE_KEY) == get_tag_versions(cls.SOURCE_TAGS):
+            return stats
+        
+        with single_flight.acquire(cls.VERSIONS_CACHE_KEY) as acquired:
+            versions = get_tag_versions(cls.SOURCE_TAGS)
+            if acquired and cache.get(cls.VERSIONS_CACHE_KEY) == versions:
+                # Recounted while we waited
+                stats.refresh_from_db()
+                return stats
+            stats.update_stats()
+            cache.set(cls.VERSIONS_CACHE_KEY, versions, timeout=None)
+        return stats
+    
+    @classmethod
+    def record_status_changes(cls, changes, new_status):
+        """Shift the cached per-status counters after a bulk status change.
+        
+        changes maps each old status to the number of events that left it.
+        """
+        updates = {
+            f'{old_status}_events': Greatest(F(f'{old_status}_events') - count, 0)
+            for old_status, count in changes.items()
+        }
+        updates[f'{new_status}_events'] = F(f'{new_status}_events') + sum(changes.values())
+        cls.objects.filter(pk=1).update(updated_at=timezone.now(), **updates)
+    
     def update_stats(self):
         """Update statistics from actual data"""
         from django.db.models import Count, Q
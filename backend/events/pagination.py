@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class EventScheduleCursorPagination(CursorPagination):
+    """Cursor pagination for schedules, nearest event first"""
+    ordering = ('date', 'time', 'id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
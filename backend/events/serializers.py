@@ -33,6 +33,9 @@ class EventParticipantSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'joined_at')
     
     def get_user_name(self, obj):
+        # Annotated by EventParticipantQuerySet.with_user_name()
+        if hasattr(obj, 'user_name'):
+            return obj.user_name
         return obj.user.get_full_name()
 
 
@@ -51,11 +54,15 @@ class EventSerializer(serializers.ModelSerializer):
             'id', 'day', 'date', 'time', 'duration', 'place', 'number_of_participants',
             'status', 'meeting_time', 'meeting_date', 'place_of_meeting', 'vehicle',
             'camera_man', 'participation_type', 'event_reason', 'created_by', 'created_by_name',
-            'created_at', 'updated_at', 'songs', 'dress_details', 'participants', 'is_upcoming', 'is_past'
+            'created_at', 'updated_at', 'songs', 'dress_details', 'participants', 'participants_count',
+            'is_upcoming', 'is_past'
         )
-        read_only_fields = ('id', 'created_at', 'updated_at', 'created_by')
+        read_only_fields = ('id', 'created_at', 'updated_at', 'created_by', 'participants_count')
     
     def get_created_by_name(self, obj):
+        # Annotated by EventQuerySet.with_computed_fields()
+        if hasattr(obj, 'created_by_name'):
+            return obj.created_by_name
         return obj.created_by.get_full_name()
     
     def create(self, validated_data):
@@ -131,6 +138,10 @@ class EventCreateSerializer(serializers.ModelSerializer):
             except User.DoesNotExist:
                 continue
         
+        if participants_data:
+            Event.sync_participants_count([event.id])
+            event.refresh_from_db(fields=['participants_count'])
+        
         return event
 
 
@@ -214,6 +225,9 @@ class EventUpdateSerializer(serializers.ModelSerializer):
                     )
                 except User.DoesNotExist:
                     continue
+            
+            Event.sync_participants_count([event.id])
+            event.refresh_from_db(fields=['participants_count'])
         
         return event
 
@@ -243,3 +257,42 @@ class DashboardSerializer(serializers.Serializer):
             'recent_events': instance['recent_events'],
             'total_users': instance['total_users']
         }
+
+
+class EventBulkStatusFilterSerializer(serializers.Serializer):
+    """Which events a bulk status update applies to, when no ids are given"""
+    status = serializers.ChoiceField(choices=Event.STATUS_CHOICES, required=False)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError('Provide at least one of status, start_date and end_date')
+        return attrs
+
+
+class EventBulkStatusUpdateSerializer(serializers.Serializer):
+    """Body of PATCH /events/status/bulk/: the new status and either ids or a filter"""
+    status = serializers.ChoiceField(choices=Event.STATUS_CHOICES)
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, required=False)
+    filter = EventBulkStatusFilterSerializer(required=False)
+    
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError('Provide either ids or a filter')
+        return attrs
+    
+    def get_queryset(self):
+        """Events selected by the validated ids or filter"""
+        if 'ids' in self.validated_data:
+            return Event.objects.filter(id__in=self.validated_data['ids'])
+        
+        filters = self.validated_data['filter']
+        queryset = Event.objects.all()
+        if 'status' in filters:
+            queryset = queryset.filter(status=filters['status'])
+        if 'start_date' in filters:
+            queryset = queryset.filter(date__gte=filters['start_date'])
+        if 'end_date' in filters:
+            queryset = queryset.filter(date__lte=filters['end_date'])
+        return queryset
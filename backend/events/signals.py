@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import DressDetail, Event, EventParticipant, Song, event_data_changed
+
+User = get_user_model()
+
+
+@receiver(pre_delete, sender=User)
+def remember_participated_events(sender, instance, **kwargs):
+    """Note which events lose a participant when the user is deleted"""
+    instance._participated_event_ids = list(
+        instance.event_participations.values_list('event_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=User)
+def resync_participants_count(sender, instance, **kwargs):
+    """Keep Event.participants_count right after cascading participant deletes"""
+    event_ids = getattr(instance, '_participated_event_ids', None)
+    if event_ids:
+        Event.sync_participants_count(event_ids)
+
+
+# Fields of a user that event documents show (created_by_name, participants)
+DOCUMENT_USER_FIELDS = {'first_name', 'last_name', 'email'}
+
+
+@receiver(post_save, sender=User)
+def rebuild_user_event_documents(sender, instance, created, update_fields=None, **kwargs):
+    """Re-render the events showing this user's name or email"""
+    if created or (update_fields is not None and not DOCUMENT_USER_FIELDS & set(update_fields)):
+        return
+    event_ids = set(instance.created_events.values_list('id', flat=True))
+    event_ids.update(instance.event_participations.values_list('event_id', flat=True))
+    if event_ids:
+        event_data_changed(event_ids)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_cache(sender, instance, **kwargs):
+    """Rebuild (or, after a delete, drop) the event's document and cached responses"""
+    event_data_changed([instance.pk])
+
+
+@receiver(post_save, sender=EventParticipant)
+@receiver(post_delete, sender=EventParticipant)
+@receiver(post_save, sender=Song)
+@receiver(post_delete, sender=Song)
+@receiver(post_save, sender=DressDetail)
+@receiver(post_delete, sender=DressDetail)
+def invalidate_event_child_cache(sender, instance, **kwargs):
+    event_data_changed([instance.event_id])
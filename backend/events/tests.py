@@ -1,3 +1,730 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import date, datetime, time, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connections, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from quran_events_backend.compression import brotli
+from quran_events_backend.db_backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from quran_events_backend.parsers import ORJSONParser
+from quran_events_backend.renderers import ORJSONRenderer, orjson
+from quran_events_backend.response_cache import build_cache_key
+from quran_events_backend.routers import pin_to_primary
+from quran_events_backend.single_flight import SingleFlight, fcntl, single_flight
+
+from .fast_serializers import event_values, serialize_events
+from .models import (
+    AlreadyJoinedError, DressDetail, Event, EventDocument, EventFullError, EventParticipant, EventStats, Song,
+    invalidate_event_responses,
+)
+from .serializers import EventSerializer
+
+User = get_user_model()
+
+
+class JoinEventTests(TestCase):
+    """join/leave keep participants_count in step with the participant rows"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'pass12345!', first_name='Event', last_name='Owner')
+        self.users = [
+            User.objects.create_user(f'user{i}', 'pass12345!', first_name='User', last_name=str(i))
+            for i in range(3)
+        ]
+        self.event = Event.objects.create(
+            day='Friday', date=date(2030, 1, 4), time=time(18, 0), duration=60,
+            place='Masjid', number_of_participants=2, created_by=self.owner,
+        )
+
+    def test_join_increments_counter(self):
+        EventParticipant.join(self.event.pk, self.users[0])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, 1)
+
+    def test_duplicate_join_does_not_double_count(self):
+        EventParticipant.join(self.event.pk, self.users[0])
+        with self.assertRaises(AlreadyJoinedError):
+            EventParticipant.join(self.event.pk, self.users[0])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, 1)
+
+    def test_capacity_is_enforced(self):
+        EventParticipant.join(self.event.pk, self.users[0])
+        EventParticipant.join(self.event.pk, self.users[1])
+        with self.assertRaises(EventFullError):
+            EventParticipant.join(self.event.pk, self.users[2])
+        self.assertEqual(EventParticipant.objects.filter(event=self.event).count(), 2)
+
+    def test_zero_capacity_means_unlimited(self):
+        Event.objects.filter(pk=self.event.pk).update(number_of_participants=0)
+        for user in self.users:
+            EventParticipant.join(self.event.pk, user)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, 3)
+
+    def test_leave_releases_place(self):
+        EventParticipant.join(self.event.pk, self.users[0])
+        EventParticipant.leave(self.event.pk, self.users[0])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, 0)
+        with self.assertRaises(EventParticipant.DoesNotExist):
+            EventParticipant.leave(self.event.pk, self.users[0])
+
+    def test_missing_event(self):
+        with self.assertRaises(Event.DoesNotExist):
+            EventParticipant.join(self.event.pk + 100, self.users[0])
+
+    def test_join_view_reports_full_event(self):
+        client = APIClient()
+        for user in self.users[:2]:
+            client.force_authenticate(user)
+            self.assertEqual(client.post(f'/api/events/{self.event.pk}/join/').status_code, 200)
+        client.force_authenticate(self.users[2])
+        self.assertEqual(client.post(f'/api/events/{self.event.pk}/join/').status_code, 409)
+
+    def test_deleting_user_resyncs_counter(self):
+        EventParticipant.join(self.event.pk, self.users[0])
+        self.users[0].delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, 0)
+
+
+class EventChildResourceTests(TestCase):
+    """Nested participant, song and dress detail endpoints of an event"""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user('owner', 'pass12345!', permissions={'events': True})
+        self.users = [User.objects.create_user(f'user{i}', 'pass12345!') for i in range(4)]
+        self.event = Event.objects.create(
+            day='Friday', date=date(2030, 1, 4), time=time(18, 0), duration=60,
+            place='Masjid', number_of_participants=2, created_by=self.owner,
+        )
+        self.url = f'/api/events/{self.event.pk}'
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_add_confirm_and_remove_participants(self):
+        user_ids = [user.pk for user in self.users[:2]]
+        response = self.client.post(f'{self.url}/participants/', {'user_ids': user_ids}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sorted(p['user_id'] for p in response.data), user_ids)
+        # Adding someone who already participates takes no extra place
+        response = self.client.post(f'{self.url}/participants/', {'user_ids': user_ids[:1]}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        ids = [p['id'] for p in self.client.get(f'{self.url}/participants/').data['results']]
+        response = self.client.patch(f'{self.url}/participants/', {'ids': ids, 'is_confirmed': True}, format='json')
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(EventParticipant.objects.filter(event=self.event, is_confirmed=True).count(), 2)
+
+        self.assertEqual(self.client.delete(f'{self.url}/participants/{ids[0]}/').status_code, 204)
+        response = self.client.delete(f'{self.url}/participants/', {'ids': ids[1:]}, format='json')
+        self.assertEqual(response.data['deleted'], 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, 0)
+
+    def test_adding_participants_over_capacity_is_rejected(self):
+        EventParticipant.join(self.event.pk, self.users[0])
+        user_ids = [user.pk for user in self.users[1:]]
+        response = self.client.post(f'{self.url}/participants/', {'user_ids': user_ids}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('user_ids', response.data)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, 1)
+        self.assertEqual(EventParticipant.objects.filter(event=self.event).count(), 1)
+
+        response = self.client.post(f'{self.url}/participants/', {'user_ids': user_ids[:1]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, 2)
+
+    def test_songs_get_next_order_and_reject_collisions(self):
+        first = self.client.post(f'{self.url}/songs/', {'title': 'Tala al-Badru'}, format='json')
+        second = self.client.post(f'{self.url}/songs/', {'title': 'Qamarun'}, format='json')
+        self.assertEqual((first.data['order'], second.data['order']), (1, 2))
+
+        response = self.client.patch(f"{self.url}/songs/{second.data['id']}/", {'order': 1}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('order', response.data)
+        response = self.client.patch(f"{self.url}/songs/{second.data['id']}/", {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.data['title'], 'Renamed')
+        self.assertEqual(
+            [song['title'] for song in self.client.get(f'{self.url}/').json()['songs']],
+            ['Tala al-Badru', 'Renamed'],
+        )
+
+    def test_dress_details(self):
+        response = self.client.post(f'{self.url}/dress-details/', {'description': 'White thobe'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        detail_url = f"{self.url}/dress-details/{response.data['id']}/"
+        self.assertEqual(self.client.get(detail_url).data['description'], 'White thobe')
+        self.assertEqual(self.client.delete(detail_url).status_code, 204)
+        self.assertEqual(self.client.get(f'{self.url}/dress-details/').data['count'], 0)
+
+    def test_other_events_children_are_not_reachable(self):
+        other = Event.objects.create(
+            day='Friday', date=date(2030, 1, 4), time=time(18, 0), duration=60, place='Hall', created_by=self.owner,
+        )
+        song = Song.objects.create(event=other, title='Elsewhere', order=1)
+        self.assertEqual(self.client.get(f'{self.url}/songs/{song.pk}/').status_code, 404)
+
+
+class UserScheduleTests(TestCase):
+    """/me/events/ and /users/<id>/events/ page through a user's events with a cursor"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('reciter', 'pass12345!', permissions={'events': True})
+        self.other = User.objects.create_user('other', 'pass12345!', permissions={'events': True})
+        self.events = []
+        for day, hour, status in ((4, 18, 'pending'), (4, 9, 'confirmed'), (11, 18, 'cancelled'),
+                                  (18, 18, 'pending'), (25, 18, 'confirmed')):
+            event = Event.objects.create(
+                day='Friday', date=date(2030, 1, day), time=time(hour, 0), duration=60,
+                place=f'Masjid {day}/{hour}', status=status, created_by=self.other,
+            )
+            EventParticipant.join(event.pk, self.user)
+            self.events.append(event)
+        # Not the user's
+        Event.objects.create(
+            day='Friday', date=date(2030, 1, 5), time=time(18, 0), duration=60, place='Elsewhere',
+            created_by=self.other,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def pages(self, url):
+        pages = []
+        while url:
+            body = self.client.get(url).json()
+            pages.append([event['id'] for event in body['results']])
+            url = body['next']
+        return pages
+
+    def test_cursor_pages_in_schedule_order(self):
+        pages = self.pages('/api/me/events/?page_size=2')
+        expected = [event.pk for event in sorted(self.events, key=lambda e: (e.date, e.time, e.pk))]
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+        # previous walks back from the last page
+        last = self.client.get('/api/me/events/?page_size=2').json()
+        last = self.client.get(self.client.get(last['next']).json()['next']).json()
+        self.assertEqual([event['id'] for event in self.client.get(last['previous']).json()['results']], pages[1])
+
+    def test_filters(self):
+        pages = self.pages('/api/me/events/?status=pending,confirmed&start_date=2030-01-05&page_size=2')
+        self.assertEqual(sum(pages, []), [self.events[3].pk, self.events[4].pk])
+
+    def test_other_users_schedule_needs_admin(self):
+        self.assertEqual(self.client.get(f'/api/users/{self.other.pk}/events/').status_code, 403)
+        admin = User.objects.create_user('admin', 'pass12345!', role='admin', permissions={'events': True})
+        self.client.force_authenticate(admin)
+        self.assertEqual(len(sum(self.pages(f'/api/users/{self.user.pk}/events/'), [])), 5)
+
+
+class ReplicaRoutingTests(TestCase):
+    """Safe requests read from a separate replica file until the user writes"""
+
+    @classmethod
+    def setUpClass(cls):
+        # A migrated but empty SQLite file stands in for a lagging replica;
+        # it is registered here so the test runner does not try to create it
+        cls.replica_dir = tempfile.mkdtemp()
+        connections.settings['replica'] = {
+            **connections['default'].settings_dict,
+            'NAME': os.path.join(cls.replica_dir, 'replica.sqlite3'),
+        }
+        call_command('migrate', database='replica', verbosity=0)
+        cls.databases = {'default', 'replica'}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        shutil.rmtree(cls.replica_dir, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('reader', 'pass12345!', permissions={'events': True})
+        self.event = Event.objects.create(
+            day='Friday', date=date(2030, 1, 4), time=time(18, 0), duration=60,
+            place='Masjid', created_by=self.user,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_safe_requests_read_from_replica(self):
+        response = self.client.get('/api/events/')
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_write_pins_user_to_primary(self):
+        self.assertEqual(self.client.post(f'/api/events/{self.event.pk}/join/').status_code, 200)
+        response = self.client.get('/api/events/')
+        self.assertEqual(response.json()['count'], 1)
+        self.assertEqual(response.json()['results'][0]['participants_count'], 1)
+
+    def test_pinned_user_reads_primary(self):
+        pin_to_primary(self.user.id)
+        self.assertEqual(self.client.get('/api/events/').json()['count'], 1)
+
+
+class ResponseCacheTests(TestCase):
+    """Cached event responses are dropped by model signals and bulk updates"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('viewer', 'pass12345!', permissions={'events': True})
+        self.event = Event.objects.create(
+            day='Friday', date=date(2030, 1, 4), time=time(18, 0), duration=60,
+            place='Masjid', created_by=self.user,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_second_request_is_served_from_cache(self):
+        self.assertEqual(self.client.get('/api/events/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/api/events/')['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get('/api/events/?status=pending')['X-Cache'], 'MISS')
+
+    def test_save_invalidates_list_and_detail(self):
+        self.client.get('/api/events/')
+        self.client.get(f'/api/events/{self.event.pk}/')
+        self.event.place = 'Community hall'
+        self.event.save()
+        response = self.client.get(f'/api/events/{self.event.pk}/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['place'], 'Community hall')
+        self.assertEqual(self.client.get('/api/events/')['X-Cache'], 'MISS')
+
+    def test_bulk_status_update_invalidates(self):
+        self.client.get(f'/api/events/{self.event.pk}/')
+        Event.bulk_update_status(Event.objects.filter(pk=self.event.pk), 'confirmed')
+        response = self.client.get(f'/api/events/{self.event.pk}/')
+        self.assertEqual(response.json()['status'], 'confirmed')
+
+
+class BulkStatusUpdateTests(TestCase):
+    """PATCH /events/status/bulk/ validates its body and updates the selected events"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', 'pass12345!', role='admin', permissions={'events': True})
+        self.events = [
+            Event.objects.create(
+                day='Friday', date=date(2030, 1, day), time=time(18, 0), duration=60,
+                place=f'Masjid {day}', created_by=self.admin,
+            )
+            for day in (4, 11, 18)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def patch(self, data):
+        return self.client.patch('/api/events/status/bulk/', data, format='json')
+
+    def statuses(self):
+        return list(Event.objects.order_by('date').values_list('status', flat=True))
+
+    def test_update_by_ids(self):
+        response = self.patch({'status': 'confirmed', 'ids': [self.events[0].pk, self.events[2].pk]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['events']), 2)
+        self.assertEqual(self.statuses(), ['confirmed', 'pending', 'confirmed'])
+
+    def test_update_by_filter(self):
+        response = self.patch({'status': 'cancelled', 'filter': {'status': 'pending', 'start_date': '2030-01-10'}})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.statuses(), ['pending', 'cancelled', 'cancelled'])
+        self.assertEqual(EventStats.get_current_stats().cancelled_events, 2)
+
+    def test_invalid_bodies_are_rejected(self):
+        for data in (
+            {'status': 'confirmed', 'filter': {'start_date': 'garbage'}},
+            {'status': 'confirmed', 'filter': {'status': 'unknown'}},
+            {'status': 'confirmed', 'filter': {}},
+            {'status': 'archived', 'ids': [self.events[0].pk]},
+            {'status': 'confirmed', 'ids': ['first']},
+            {'status': 'confirmed', 'ids': []},
+            {'status': 'confirmed'},
+            {'status': 'confirmed', 'ids': [self.events[0].pk], 'filter': {'status': 'pending'}},
+        ):
+            with self.subTest(data=data):
+                self.assertEqual(self.patch(data).status_code, 400)
+        self.assertEqual(self.statuses(), ['pending'] * 3)
+
+    def test_requires_admin_role(self):
+        self.client.force_authenticate(User.objects.create_user('member', 'pass12345!', permissions={'events': True}))
+        self.assertEqual(self.patch({'status': 'confirmed', 'ids': [self.events[0].pk]}).status_code, 403)
+
+    def test_complete_past_events_command(self):
+        for day, status in enumerate(['pending', 'confirmed', 'pending', 'confirmed', 'pending', 'cancelled'], 1):
+            Event.objects.create(
+                day='Monday', date=date(2020, 6, day), time=time(18, 0), duration=60,
+                place=f'Past {day}', status=status, created_by=self.admin,
+            )
+        self.assertEqual(EventStats.get_current_stats().completed_events, 0)
+        out = io.StringIO()
+        call_command('complete_past_events', batch_size=2, pause=0, stdout=out)
+        self.assertIn('Marked 5 past events as completed in 3 batches', out.getvalue())
+        past = Event.objects.filter(date__lt=date(2021, 1, 1)).order_by('date').values_list('status', flat=True)
+        self.assertEqual(list(past), ['completed'] * 5 + ['cancelled'])
+        self.assertEqual(self.statuses()[-3:], ['pending'] * 3)
+
+        stats = EventStats.get_current_stats()
+        self.assertEqual(
+            (stats.total_events, stats.pending_events, stats.completed_events, stats.cancelled_events), (9, 3, 5, 1)
+        )
+        with self.assertRaises(CommandError):
+            call_command('complete_past_events', batch_size=0, stdout=io.StringIO())
+
+
+class SingleFlightTests(TestCase):
+    """Expensive recomputations run once while concurrent callers wait or get stale data"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('viewer', 'pass12345!', permissions={'events': True})
+        Event.objects.create(
+            day='Friday', date=date(2030, 1, 4), time=time(18, 0), duration=60,
+            place='Masjid', created_by=self.user,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_second_caller_does_not_get_the_lock(self):
+        with single_flight.acquire('key') as first:
+            with single_flight.acquire('key', blocking=False) as second:
+                self.assertTrue(first)
+                self.assertFalse(second)
+        with single_flight.acquire('key', blocking=False) as again:
+            self.assertTrue(again)
+
+    @skipUnless(fcntl, 'no flock() on this platform')
+    def test_workers_share_lock_files_that_do_not_pile_up(self):
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir)
+        worker, other_worker = SingleFlight(lock_dir), SingleFlight(lock_dir)
+        for key in ('/api/events/?page=1', '/api/events/?page=2'):
+            with worker.acquire(key) as first:
+                with other_worker.acquire(key, blocking=False) as second:
+                    self.assertEqual((first, second), (True, False))
+                self.assertEqual(len(os.listdir(lock_dir)), 1)
+        self.assertEqual(os.listdir(lock_dir), [])
+
+    def test_stats_are_recounted_only_after_changes(self):
+        stats = EventStats.get_current_stats()
+        self.assertEqual(stats.total_events, 1)
+        with self.assertNumQueries(1):
+            EventStats.get_current_stats()
+        Event.objects.create(
+            day='Friday', date=date(2030, 1, 11), time=time(18, 0), duration=60,
+            place='Masjid', created_by=self.user,
+        )
+        self.assertEqual(EventStats.get_current_stats().total_events, 2)
+
+    def test_stale_response_served_while_rebuild_runs(self):
+        request = Request(self.client.get('/api/dashboard/').wsgi_request)
+        request.user, request.auth = self.user, None
+        key = build_cache_key(request)
+        invalidate_event_responses([])
+        # Another request is rebuilding the dashboard
+        with single_flight.acquire(key):
+            response = self.client.get('/api/dashboard/')
+        self.assertEqual(response['X-Cache'], 'STALE')
+
+
+class CompressionTests(TestCase):
+    """Responses are compressed above the size threshold, with Brotli preferred for API JSON when accepted"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('viewer', 'pass12345!', permissions={'events': True})
+        Event.objects.bulk_create([
+            Event(
+                day='Friday', date=date(2030, 1, 4), time=time(18, 0), duration=60,
+                place=f'Masjid {i}', created_by=self.user,
+            )
+            for i in range(20)
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_gzip_for_large_responses(self):
+        response = self.client.get('/api/events/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.content))['count'], 20)
+
+    @skipUnless(brotli, 'brotli is not installed')
+    def test_brotli_preferred(self):
+        response = self.client.get('/api/events/', HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(json.loads(brotli.decompress(response.content))['count'], 20)
+
+    def test_small_responses_left_alone(self):
+        response = self.client.get('/api/events/?status=cancelled', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    @skipUnless(brotli, 'brotli is not installed')
+    def test_html_pages_stay_on_gzip(self):
+        response = self.client.get('/admin/login/', HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('csrfmiddlewaretoken', gzip.decompress(response.content).decode())
+
+
+class StaticFilesTests(SimpleTestCase):
+    """WhiteNoise serves collected static files, precompressed and cached forever when hashed"""
+
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root)
+        os.makedirs(os.path.join(self.static_root, 'css'))
+        # What collectstatic leaves behind with the production storage
+        css = b'body { margin: 0; }\n' * 100
+        for name, content in (
+            ('css/site.css', css),
+            ('css/site.0123456789ab.css', css),
+            ('css/site.0123456789ab.css.gz', gzip.compress(css)),
+            ('staticfiles.json', json.dumps({
+                'version': '1.1', 'paths': {'css/site.css': 'css/site.0123456789ab.css'},
+            }).encode()),
+        ):
+            with open(os.path.join(self.static_root, name), 'wb') as f:
+                f.write(content)
+
+    def test_precompressed_immutable(self):
+        storages = {
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+        }
+        with override_settings(STATIC_ROOT=self.static_root, STORAGES=storages):
+            response = self.client.get('/static/css/site.0123456789ab.css', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b'body { margin: 0; }\n' * 100)
+        response.close()
+
+
+class SQLiteBackendTests(SimpleTestCase):
+    """The SQLite backend applies its pragmas and transaction mode to file databases"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.name = os.path.join(directory, 'db.sqlite3')
+
+    def connect(self, **options):
+        settings_dict = connections.configure_settings({
+            'default': {'ENGINE': 'quran_events_backend.db_backends.sqlite3', 'NAME': self.name, 'OPTIONS': options},
+        })['default']
+        wrapper = SQLiteDatabaseWrapper(settings_dict, alias='sqlite-backend-test')
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        return wrapper.connection.execute(f'PRAGMA {name}').fetchone()[0]
+
+    def test_pragmas(self):
+        wrapper = self.connect(pragmas={'busy_timeout': 1234, 'synchronous': 'FULL'})
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 1234)
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 2)  # FULL
+
+    def test_immediate_transactions_take_the_write_lock_at_begin(self):
+        writer = self.connect(transaction_mode='immediate', pragmas={'busy_timeout': 0})
+        other = self.connect(pragmas={'busy_timeout': 0})
+
+        writer._start_transaction_under_autocommit()
+        self.addCleanup(writer.connection.rollback)
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'database is locked'):
+            other.connection.execute('BEGIN IMMEDIATE')
+
+    def test_deferred_transactions_wait_for_the_first_write(self):
+        reader = self.connect(transaction_mode='deferred', pragmas={'busy_timeout': 0})
+        other = self.connect(pragmas={'busy_timeout': 0})
+
+        reader._start_transaction_under_autocommit()
+        self.addCleanup(reader.connection.rollback)
+        other.connection.execute('BEGIN IMMEDIATE')
+        other.connection.rollback()
+
+    def test_invalid_options(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.connect(transaction_mode='eventually')
+        with self.assertRaises(ImproperlyConfigured):
+            self.connect(pragmas={'journal_mode; DROP TABLE users': 'WAL'})
+
+
+@skipUnless(orjson, 'orjson is not installed')
+class ORJSONRendererTests(TestCase):
+    """The orjson renderer and parser are drop-in replacements for DRF's JSON ones"""
+
+    def test_output_matches_json_renderer(self):
+        data = {
+            'created_at': datetime(2030, 1, 4, 18, 0, 30, 250, tzinfo=dt_timezone.utc),
+            'date': date(2030, 1, 4),
+            'time': time(18, 0),
+            'cost': Decimal('12.50'),
+            'label': gettext_lazy('Events'),
+            'place': 'Masjid\u2028hall',
+            1: ['العربية', None, True],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_invalid_json_is_a_parse_error(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"place": '))
+
+
+class FastEventSerializerTests(TestCase):
+    """events.fast_serializers and the stored event documents produce exactly EventSerializer's output"""
+
+    def setUp(self):
+        # Documents are rebuilt on commit, which TestCase only simulates
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owner = User.objects.create_user(
+                'owner', 'pass12345!', first_name='Event', last_name='Owner', email='owner@example.com'
+            )
+            nameless = User.objects.create_user('nameless', 'pass12345!', email='nameless@example.com')
+            past = Event.objects.create(
+                day='Monday', date=date(2020, 3, 2), time=time(9, 15), duration=45, place='Old hall',
+                status='completed', created_by=self.owner,
+            )
+            upcoming = Event.objects.create(
+                day='Friday', date=date(2030, 1, 4), time=time(18, 0), duration=60, place='Masjid',
+                meeting_time=time(17, 30), meeting_date=date(2030, 1, 4), place_of_meeting='Gate',
+                vehicle='Bus', camera_man='Ali', participation_type='Choir', event_reason='Eid',
+                created_by=nameless,
+            )
+            Song.objects.create(event=upcoming, title='Second', duration=200, order=2)
+            Song.objects.create(event=upcoming, title='First', artist='Ensemble', duration=180, order=1)
+            DressDetail.objects.create(event=upcoming, description='White thobe', order=1)
+            EventParticipant.join(upcoming.pk, self.owner)
+            EventParticipant.join(upcoming.pk, nameless)
+            EventParticipant.join(past.pk, nameless)
+
+    def test_same_json_as_event_serializer(self):
+        queryset = Event.objects.select_related('created_by').prefetch_related(
+            'songs', 'dress_details', 'participants__user'
+        ).order_by('date', 'time')
+        expected = JSONRenderer().render(EventSerializer(queryset, many=True).data)
+        self.assertEqual(JSONRenderer().render(serialize_events(event_values(queryset))), expected)
+
+    def test_annotations_match_properties(self):
+        for event in Event.objects.with_computed_fields().select_related('created_by'):
+            plain = Event.objects.get(pk=event.pk)
+            self.assertEqual((event.is_upcoming, event.is_past), (plain.is_upcoming, plain.is_past))
+            self.assertEqual(event.created_by_name, event.created_by.get_full_name())
+        for participant in EventParticipant.objects.with_user_name().select_related('user'):
+            self.assertEqual(participant.user_name, participant.user.get_full_name())
+
+    def test_changed_date_ignores_stale_annotation(self):
+        event = Event.objects.with_computed_fields().get(place='Old hall')
+        self.assertTrue(event.is_past)
+        event.date = date(2030, 3, 2)
+        self.assertTrue(event.is_upcoming)
+        self.assertFalse(event.is_past)
+
+    def serialized(self, queryset):
+        queryset = queryset.select_related('created_by').prefetch_related('songs', 'dress_details', 'participants__user')
+        return json.loads(JSONRenderer().render(EventSerializer(queryset, many=True).data))
+
+    def test_list_endpoint_splices_documents(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        with self.assertNumQueries(3):  # count, page, documents
+            response = client.get('/api/events/')
+        body = json.loads(response.content)
+        self.assertEqual(body['count'], 2)
+        self.assertEqual(body['results'], self.serialized(Event.objects.order_by('date', 'time')))
+
+        event = Event.objects.get(place='Masjid')
+        response = client.get(f'/api/events/{event.pk}/')
+        self.assertEqual(json.loads(response.content), self.serialized(Event.objects.filter(pk=event.pk))[0])
+        response = client.get(f'/api/events/{event.pk}/', HTTP_ACCEPT='text/html')
+        self.assertContains(response, '&quot;place&quot;: &quot;Masjid&quot;')
+
+    def test_changes_rebuild_documents(self):
+        event = Event.objects.get(place='Masjid')
+        with self.captureOnCommitCallbacks(execute=True):
+            Song.objects.filter(event=event, order=1).get().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owner.first_name = 'Renamed'
+            self.owner.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            EventParticipant.leave(event.pk, User.objects.get(username='nameless'))
+        self.assertEqual(
+            json.loads(EventDocument.objects.get(event=event).body)
+            | {'is_upcoming': True, 'is_past': False},
+            self.serialized(Event.objects.filter(pk=event.pk))[0],
+        )
+        self.assertIn('Renamed Owner', EventDocument.objects.get(event=event).body)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            event.delete()
+        self.assertFalse(EventDocument.objects.filter(event_id=event.pk).exists())
+
+    def test_one_rebuild_per_transaction(self):
+        event = Event.objects.get(place='Masjid')
+        with mock.patch.object(EventDocument, 'rebuild', side_effect=EventDocument.rebuild) as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    for order in range(3, 8):
+                        Song.objects.create(event=event, title=f'Song {order}', order=order)
+                    event.songs.filter(order__gte=6).delete()
+                    event.save()
+            rebuild.assert_called_once_with([event.pk])
+            self.assertEqual(json.loads(EventDocument.objects.get(event=event).body)['songs'][-1]['order'], 5)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    Song.objects.create(event=event, title='Rolled back', order=9)
+                    transaction.set_rollback(True)
+            rebuild.assert_called_once()
+
+    def test_consistency_check(self):
+        call_command('check_event_documents', stdout=io.StringIO())
+        EventDocument.objects.filter(event__place='Masjid').update(body='{"id":0}')
+        EventDocument.objects.filter(event__place='Old hall').delete()
+        out = io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command('check_event_documents', stdout=out)
+        self.assertIn('missing: 1', out.getvalue())
+        self.assertIn('stale: 1', out.getvalue())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('check_event_documents', fix=True, stdout=io.StringIO())
+        call_command('check_event_documents', stdout=io.StringIO())
+
+    def test_rebuild_command(self):
+        EventDocument.objects.update(body='{"id":0}')
+        out = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('rebuild_event_documents', batch_size=1, pause=0, stdout=out)
+        self.assertIn('Rebuilt 2 event documents', out.getvalue())
+        call_command('check_event_documents', stdout=io.StringIO())
+        with self.assertRaises(CommandError):
+            call_command('rebuild_event_documents', batch_size=0, stdout=io.StringIO())
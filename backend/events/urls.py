@@ -6,16 +6,28 @@ urlpatterns = [
     path('events/', views.EventListView.as_view(), name='event_list'),
     path('events/<int:pk>/', views.EventDetailView.as_view(), name='event_detail'),
     path('events/<int:pk>/status/', views.EventStatusUpdateView.as_view(), name='event_status_update'),
+    path('events/status/bulk/', views.EventBulkStatusUpdateView.as_view(), name='event_bulk_status_update'),
     path('events/status/<str:status>/', views.EventByStatusView.as_view(), name='events_by_status'),
     path('events/search/', views.EventSearchView.as_view(), name='event_search'),
     path('events/upcoming/', views.upcoming_events_view, name='upcoming_events'),
     path('events/past/', views.past_events_view, name='past_events'),
     path('events/<int:pk>/join/', views.join_event_view, name='join_event'),
     path('events/<int:pk>/leave/', views.leave_event_view, name='leave_event'),
+    path('events/<int:pk>/participants/', views.EventParticipantListView.as_view(), name='event_participants'),
+    path('events/<int:pk>/participants/<int:participant_pk>/', views.EventParticipantDetailView.as_view(), name='event_participant_detail'),
+    path('events/<int:pk>/songs/', views.EventSongListView.as_view(), name='event_songs'),
+    path('events/<int:pk>/songs/<int:song_pk>/', views.EventSongDetailView.as_view(), name='event_song_detail'),
+    path('events/<int:pk>/dress-details/', views.EventDressDetailListView.as_view(), name='event_dress_details'),
+    path('events/<int:pk>/dress-details/<int:dress_detail_pk>/', views.EventDressDetailDetailView.as_view(), name='event_dress_detail_detail'),
+    
+    # Schedules
+    path('me/events/', views.UserScheduleView.as_view(), name='my_events'),
+    path('users/<int:user_id>/events/', views.UserScheduleView.as_view(), name='user_events'),
     
     # Dashboard and Stats
     path('dashboard/', views.DashboardView.as_view(), name='dashboard'),
     path('stats/', views.EventStatsView.as_view(), name='event_stats'),
+    path('cache/stats/', views.response_cache_stats_view, name='response_cache_stats'),
     
     # Excel Import/Export
     path('events/import/sample/', views.download_sample_excel, name='download_sample_excel'),
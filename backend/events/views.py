@@ -2,12 +2,19 @@ from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Q, Count
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.generics import get_object_or_404
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Count, Max
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.http import HttpResponse
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
+from accounts.page_permissions import EVENT_PAGES, Page
+from accounts.permissions import HasPagePermission, IsAdminOrCoordinatorRole, IsAdminRole, requires_pages
+from quran_events_backend.response_cache import CachedResponseMixin, cache_response, get_stats
+from quran_events_backend.routers import ReplicaReadMixin, replica_reads
 try:
     import openpyxl
     from openpyxl import Workbook
@@ -18,19 +25,43 @@ except ImportError:
 from datetime import datetime, date, time
 import io
 import os
-from .models import Event, Song, EventParticipant, EventStats
+from .models import (
+    AlreadyJoinedError, DressDetail, Event, EventFullError, EventParticipant, EventStats, Song,
+    event_data_changed
+)
+from .documents import DOCUMENT_ROW_FIELDS, event_json, events_json, paginated_events_json
+from .pagination import EventScheduleCursorPagination
 from .serializers import (
     EventSerializer, EventCreateSerializer, EventUpdateSerializer,
-    EventStatsSerializer, DashboardSerializer
+    EventStatsSerializer, DashboardSerializer, EventParticipantSerializer,
+    SongSerializer, DressDetailSerializer, EventBulkStatusUpdateSerializer
 )
 
 User = get_user_model()
 
 
+class EventDocumentListMixin:
+    """List events from their stored documents (events.documents) instead of EventSerializer.
+    
+    The filtered queryset is paginated as id and date rows; the page's
+    documents are then read in one query and spliced into the response.
+    """
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).values(*DOCUMENT_ROW_FIELDS)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return Response(paginated_events_json(self.paginator, page))
+        return Response(events_json(queryset))
+
 
-class EventListView(generics.ListCreateAPIView):
+class EventListView(ReplicaReadMixin, CachedResponseMixin, EventDocumentListMixin, generics.ListCreateAPIView):
     """List and create events"""
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, HasPagePermission]
+    read_pages = EVENT_PAGES
+    write_pages = Page.EVENTS
+    claims_authentication = True
+    cache_tags = ('events:list',)
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -96,19 +127,29 @@ class EventListView(generics.ListCreateAPIView):
         serializer.save(created_by=self.request.user)
 
 
-class EventDetailView(generics.RetrieveUpdateDestroyAPIView):
+class EventDetailView(ReplicaReadMixin, CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     """Event detail view"""
     serializer_class = EventSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, HasPagePermission]
+    read_pages = EVENT_PAGES
+    write_pages = Page.EVENTS
+    claims_authentication = True
+    cache_tags = ('event:{pk}', 'users')
     
     def get_queryset(self):
-        return Event.objects.select_related('created_by').prefetch_related('songs', 'participants__user')
+        return Event.objects.with_computed_fields().with_children()
     
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
             return EventUpdateSerializer
         return EventSerializer
     
+    def retrieve(self, request, *args, **kwargs):
+        # Served from the stored document; only the date is read from events
+        row = get_object_or_404(Event.objects.values(*DOCUMENT_ROW_FIELDS), pk=self.kwargs['pk'])
+        self.check_object_permissions(request, row)
+        return Response(event_json(row))
+    
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
@@ -120,9 +161,11 @@ class EventDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Response(return_serializer.data)
 
 
-class EventStatusUpdateView(APIView):
+class EventStatusUpdateView(ReplicaReadMixin, APIView):
     """Update event status"""
-    permission_classes = [permissions.IsAuthenticated]
+    # Only admins and coordinators can update status
+    permission_classes = [permissions.IsAuthenticated, IsAdminOrCoordinatorRole, HasPagePermission]
+    read_pages = Page.EVENTS
     
     def patch(self, request, pk):
         try:
@@ -135,13 +178,6 @@ class EventStatusUpdateView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Only admins and coordinators can update status
-            if not (request.user.is_admin or request.user.is_coordinator):
-                return Response(
-                    {'error': 'Permission denied'},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            
             event.status = new_status
             event.save()
             
@@ -157,27 +193,189 @@ class EventStatusUpdateView(APIView):
             )
 
 
-class DashboardView(APIView):
+class EventBulkStatusUpdateView(ReplicaReadMixin, APIView):
+    """Update the status of many events at once"""
+    # Only admins and coordinators can update status
+    permission_classes = [permissions.IsAuthenticated, IsAdminOrCoordinatorRole, HasPagePermission]
+    read_pages = Page.EVENTS
+    
+    def patch(self, request):
+        serializer = EventBulkStatusUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        new_status = serializer.validated_data['status']
+        queryset = serializer.get_queryset()
+        
+        with transaction.atomic():
+            event_ids = Event.bulk_update_status(queryset, new_status)
+        
+        return Response({
+            'message': f'Updated status of {len(event_ids)} events',
+            'events': [{'id': event_id, 'status': new_status} for event_id in event_ids]
+        })
+
+
+def get_id_list(data, key):
+    """Return data[key] as a list of integer ids, raising ValidationError otherwise"""
+    ids = data.get(key)
+    if not isinstance(ids, list) or not ids or not all(isinstance(pk, int) for pk in ids):
+        raise ValidationError({key: 'Must be a non-empty list of ids'})
+    return ids
+
+
+class EventChildMixin(ReplicaReadMixin, CachedResponseMixin):
+    """Scope a nested event resource (participants, songs, dress details) to the event in the URL"""
+    permission_classes = [permissions.IsAuthenticated, HasPagePermission]
+    read_pages = EVENT_PAGES
+    write_pages = Page.EVENTS
+    claims_authentication = True
+    cache_tags = ('event:{pk}', 'users')
+    
+    def get_event(self):
+        if not hasattr(self, '_event'):
+            self._event = get_object_or_404(Event.objects.only('id'), pk=self.kwargs['pk'])
+        return self._event
+    
+    def save_ordered_child(self, serializer, **kwargs):
+        """Save a song or dress detail, turning order collisions into a 400"""
+        try:
+            with transaction.atomic():
+                serializer.save(**kwargs)
+        except IntegrityError:
+            raise ValidationError({'order': 'Another item of this event already uses this order'})
+    
+    def next_order(self):
+        current = self.get_queryset().aggregate(max_order=Max('order'))['max_order']
+        return (current or 0) + 1
+
+
+class EventParticipantListView(EventChildMixin, generics.ListAPIView):
+    """List, add, remove and bulk-confirm the participants of an event"""
+    serializer_class = EventParticipantSerializer
+    
+    def get_queryset(self):
+        return EventParticipant.objects.filter(event=self.get_event()).select_related('user').order_by('id')
+    
+    def post(self, request, pk):
+        user_ids = get_id_list(request.data, 'user_ids')
+        event = self.get_event()
+        valid_user_ids = list(User.objects.filter(id__in=user_ids, is_active=True).values_list('id', flat=True))
+        
+        try:
+            EventParticipant.add_many(event.id, valid_user_ids)
+        except EventFullError:
+            raise ValidationError({'user_ids': 'The event does not have enough places left for these users'})
+        
+        participants = self.get_queryset().filter(user_id__in=valid_user_ids)
+        return Response(self.get_serializer(participants, many=True).data, status=status.HTTP_201_CREATED)
+    
+    def patch(self, request, pk):
+        ids = get_id_list(request.data, 'ids')
+        is_confirmed = request.data.get('is_confirmed')
+        if not isinstance(is_confirmed, bool):
+            raise ValidationError({'is_confirmed': 'Must be true or false'})
+        
+        with transaction.atomic():
+            updated = self.get_queryset().filter(id__in=ids).update(is_confirmed=is_confirmed)
+            event_data_changed([pk])
+        return Response({'updated': updated, 'ids': ids, 'is_confirmed': is_confirmed})
+    
+    def delete(self, request, pk):
+        ids = get_id_list(request.data, 'ids')
+        event = self.get_event()
+        
+        with transaction.atomic():
+            deleted, _ = EventParticipant.objects.filter(event=event, id__in=ids).delete()
+            Event.sync_participants_count([event.id])
+        
+        return Response({'deleted': deleted})
+
+
+class EventParticipantDetailView(EventChildMixin, generics.RetrieveUpdateDestroyAPIView):
+    """Confirm or remove a single participant of an event"""
+    serializer_class = EventParticipantSerializer
+    lookup_url_kwarg = 'participant_pk'
+    
+    def get_queryset(self):
+        return EventParticipant.objects.filter(event=self.get_event()).select_related('user')
+    
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            Event.sync_participants_count([instance.event_id])
+
+
+class EventSongListView(EventChildMixin, generics.ListCreateAPIView):
+    """List and add songs of an event"""
+    serializer_class = SongSerializer
+    
+    def get_queryset(self):
+        return Song.objects.filter(event=self.get_event()).order_by('order')
+    
+    def perform_create(self, serializer):
+        order = serializer.validated_data.get('order') or self.next_order()
+        self.save_ordered_child(serializer, event=self.get_event(), order=order)
+
+
+class EventSongDetailView(EventChildMixin, generics.RetrieveUpdateDestroyAPIView):
+    """Edit or remove a single song of an event"""
+    serializer_class = SongSerializer
+    lookup_url_kwarg = 'song_pk'
+    
+    def get_queryset(self):
+        return Song.objects.filter(event=self.get_event())
+    
+    def perform_update(self, serializer):
+        self.save_ordered_child(serializer)
+
+
+class EventDressDetailListView(EventChildMixin, generics.ListCreateAPIView):
+    """List and add dress details of an event"""
+    serializer_class = DressDetailSerializer
+    
+    def get_queryset(self):
+        return DressDetail.objects.filter(event=self.get_event()).order_by('order')
+    
+    def perform_create(self, serializer):
+        order = serializer.validated_data.get('order') or self.next_order()
+        self.save_ordered_child(serializer, event=self.get_event(), order=order)
+
+
+class EventDressDetailDetailView(EventChildMixin, generics.RetrieveUpdateDestroyAPIView):
+    """Edit or remove a single dress detail of an event"""
+    serializer_class = DressDetailSerializer
+    lookup_url_kwarg = 'dress_detail_pk'
+    
+    def get_queryset(self):
+        return DressDetail.objects.filter(event=self.get_event())
+    
+    def perform_update(self, serializer):
+        self.save_ordered_child(serializer)
+
+
+class DashboardView(ReplicaReadMixin, CachedResponseMixin, APIView):
     """Dashboard data endpoint"""
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, HasPagePermission]
+    read_pages = EVENT_PAGES
+    claims_authentication = True
+    cache_tags = ('events:list', 'users')
     
     def get(self, request):
-        # Get or create stats
-        stats = EventStats.get_or_create_stats()
-        stats.update_stats()
+        # Recounted only after events or users changed
+        stats = EventStats.get_current_stats()
+        
+        today = timezone.now().date()
+        events = Event.objects.with_computed_fields(today).with_children()
         
         # Get upcoming event (nearest event to current time, including pending)
         # First try to get future events
-        upcoming_event = Event.objects.filter(
-            date__gte=timezone.now().date()
-        ).order_by('date', 'time').first()
+        upcoming_event = events.filter(date__gte=today).order_by('date', 'time').first()
         
         # If no future events, get the most recent event (nearest to today)
         if not upcoming_event:
-            upcoming_event = Event.objects.order_by('date', 'time').first()
+            upcoming_event = events.order_by('date', 'time').first()
         
         # Get recent events
-        recent_events = Event.objects.select_related('created_by').prefetch_related('songs')[:5]
+        recent_events = events[:5]
         
         # Get total users
         total_users = User.objects.count()
@@ -192,32 +390,40 @@ class DashboardView(APIView):
         return Response(dashboard_data)
 
 
-class EventStatsView(APIView):
+class EventStatsView(ReplicaReadMixin, CachedResponseMixin, APIView):
     """Event statistics endpoint"""
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, HasPagePermission]
+    read_pages = EVENT_PAGES
+    claims_authentication = True
+    cache_tags = ('events:list', 'users')
     
     def get(self, request):
-        # Get or create stats
-        stats = EventStats.get_or_create_stats()
-        stats.update_stats()
+        # Recounted only after events or users changed
+        stats = EventStats.get_current_stats()
         
         return Response(EventStatsSerializer(stats).data)
 
 
-class EventByStatusView(generics.ListAPIView):
+class EventByStatusView(ReplicaReadMixin, CachedResponseMixin, EventDocumentListMixin, generics.ListAPIView):
     """Get events by status"""
     serializer_class = EventSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, HasPagePermission]
+    read_pages = EVENT_PAGES
+    claims_authentication = True
+    cache_tags = ('events:list',)
     
     def get_queryset(self):
         status = self.kwargs.get('status')
         return Event.objects.filter(status=status).select_related('created_by').prefetch_related('songs', 'participants__user').order_by('-created_at')
 
 
-class EventSearchView(generics.ListAPIView):
+class EventSearchView(ReplicaReadMixin, CachedResponseMixin, EventDocumentListMixin, generics.ListAPIView):
     """Search events"""
     serializer_class = EventSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, HasPagePermission]
+    read_pages = EVENT_PAGES
+    claims_authentication = True
+    cache_tags = ('events:list',)
     
     def get_queryset(self):
         queryset = Event.objects.select_related('created_by').prefetch_related('songs', 'dress_details', 'participants__user')
@@ -227,6 +433,11 @@ class EventSearchView(generics.ListAPIView):
         if place:
             queryset = queryset.filter(place__icontains=place)
         
+        # Search by event reason
+        reason = self.request.query_params.get('reason')
+        if reason:
+            queryset = queryset.filter(event_reason__icontains=reason)
+        
         # Search by day
         day = self.request.query_params.get('day')
         if day:
@@ -243,78 +454,120 @@ class EventSearchView(generics.ListAPIView):
         return queryset.order_by('-created_at')
 
 
+class UserScheduleView(ReplicaReadMixin, CachedResponseMixin, EventDocumentListMixin, generics.ListAPIView):
+    """Events a user participates in (/me/events/ or /users/<id>/events/)"""
+    serializer_class = EventSerializer
+    permission_classes = [permissions.IsAuthenticated, HasPagePermission]
+    read_pages = EVENT_PAGES
+    pagination_class = EventScheduleCursorPagination
+    claims_authentication = True
+    cache_tags = ('events:list',)
+    cache_per_user = True
+    
+    def get_queryset(self):
+        user_id = self.kwargs.get('user_id', self.request.user.id)
+        
+        # Users can read their own schedule, admins can read anyone's
+        if user_id != self.request.user.id and not self.request.user.is_admin:
+            raise PermissionDenied("Only administrators can view other users' schedules")
+        
+        # Joins through event_participants(user_id, event_id)
+        queryset = Event.objects.filter(participants__user_id=user_id).select_related(
+            'created_by'
+        ).prefetch_related('songs', 'dress_details', 'participants__user')
+        
+        status_filter = self.request.query_params.get('status')
+        if status_filter:
+            queryset = queryset.filter(status__in=status_filter.split(','))
+        
+        start_date = self.request.query_params.get('start_date')
+        end_date = self.request.query_params.get('end_date')
+        if start_date:
+            queryset = queryset.filter(date__gte=start_date)
+        if end_date:
+            queryset = queryset.filter(date__lte=end_date)
+        
+        if self.request.query_params.get('upcoming') in ('1', 'true'):
+            queryset = queryset.filter(date__gte=timezone.now().date())
+        
+        return queryset
+
+
 @api_view(['GET'])
-@permission_classes([permissions.IsAuthenticated])
+@permission_classes([permissions.IsAuthenticated, requires_pages(EVENT_PAGES)])
+@replica_reads
+@cache_response(['events:list'])
 def upcoming_events_view(request):
     """Get upcoming events"""
     events = Event.objects.filter(
         date__gte=timezone.now().date(),
         status__in=['pending', 'confirmed']
-    ).select_related('created_by').prefetch_related('songs').order_by('date', 'time')
+    ).order_by('date', 'time')
     
-    return Response(EventSerializer(events, many=True).data)
+    return Response(events_json(events.values(*DOCUMENT_ROW_FIELDS)))
 
 
 @api_view(['GET'])
-@permission_classes([permissions.IsAuthenticated])
+@permission_classes([permissions.IsAuthenticated, requires_pages(EVENT_PAGES)])
+@replica_reads
+@cache_response(['events:list'])
 def past_events_view(request):
     """Get past events"""
     events = Event.objects.filter(
         date__lt=timezone.now().date()
-    ).select_related('created_by').prefetch_related('songs').order_by('-date', '-time')
+    ).order_by('-date', '-time')
     
-    return Response(EventSerializer(events, many=True).data)
+    return Response(events_json(events.values(*DOCUMENT_ROW_FIELDS)))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, IsAdminRole])
+def response_cache_stats_view(request):
+    """Response cache hit/miss counters (shared across workers only with a shared cache backend)"""
+    return Response(get_stats())
 
 
 @api_view(['POST'])
-@permission_classes([permissions.IsAuthenticated])
+@permission_classes([permissions.IsAuthenticated, requires_pages(EVENT_PAGES)])
+@replica_reads
 def join_event_view(request, pk):
     """Join an event"""
     try:
-        event = Event.objects.get(pk=pk)
-        
-        # Check if user is already a participant
-        if EventParticipant.objects.filter(event=event, user=request.user).exists():
-            return Response(
-                {'error': 'Already joined this event'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Create participation
-        participant = EventParticipant.objects.create(
-            event=event,
-            user=request.user,
-            is_confirmed=False
-        )
-        
-        return Response({
-            'message': 'Successfully joined the event',
-            'participant': {
-                'id': participant.id,
-                'user': request.user.get_full_name(),
-                'joined_at': participant.joined_at,
-                'is_confirmed': participant.is_confirmed
-            }
-        })
-        
+        participant = EventParticipant.join(pk, request.user)
     except Event.DoesNotExist:
         return Response(
             {'error': 'Event not found'},
             status=status.HTTP_404_NOT_FOUND
         )
+    except AlreadyJoinedError:
+        return Response(
+            {'error': 'Already joined this event'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except EventFullError:
+        return Response(
+            {'error': 'This event has no places left'},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    return Response({
+        'message': 'Successfully joined the event',
+        'participant': {
+            'id': participant['id'],
+            'user': request.user.get_full_name(),
+            'joined_at': participant['joined_at'],
+            'is_confirmed': False
+        }
+    })
 
 
 @api_view(['DELETE'])
-@permission_classes([permissions.IsAuthenticated])
+@permission_classes([permissions.IsAuthenticated, requires_pages(EVENT_PAGES)])
+@replica_reads
 def leave_event_view(request, pk):
     """Leave an event"""
     try:
-        event = Event.objects.get(pk=pk)
-        participant = EventParticipant.objects.get(event=event, user=request.user)
-        participant.delete()
-        
-        return Response({'message': 'Successfully left the event'})
-        
+        EventParticipant.leave(pk, request.user)
     except Event.DoesNotExist:
         return Response(
             {'error': 'Event not found'},
@@ -325,10 +578,12 @@ def leave_event_view(request, pk):
             {'error': 'Not participating in this event'},
             status=status.HTTP_400_BAD_REQUEST
         )
+    
+    return Response({'message': 'Successfully left the event'})
 
 
 @api_view(['GET'])
-@permission_classes([permissions.IsAuthenticated])
+@permission_classes([permissions.IsAuthenticated, requires_pages(Page.EVENTS)])
 def download_sample_excel(request):
     """Download sample Excel file for event import"""
     if not OPENPYXL_AVAILABLE:
@@ -406,7 +661,8 @@ def download_sample_excel(request):
 
 
 @api_view(['POST'])
-@permission_classes([permissions.IsAuthenticated])
+@permission_classes([permissions.IsAuthenticated, requires_pages(Page.EVENTS)])
+@replica_reads
 def import_events_excel(request):
     """Import events from Excel file"""
     if not OPENPYXL_AVAILABLE:
@@ -587,8 +843,7 @@ def import_events_excel(request):
         
         # Update statistics
         try:
-            stats = EventStats.get_or_create_stats()
-            stats.update_stats()
+            EventStats.get_current_stats()
         except:
             pass  # Don't fail import if stats update fails
         
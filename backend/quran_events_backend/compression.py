@@ -0,0 +1,97 @@
+"""
+Response compression: Brotli for JSON API responses when the client and
+server support it, gzip otherwise.
+
+Responses shorter than COMPRESSION_MIN_LENGTH bytes go out as they are;
+the headers and framing would eat most of the gain. Brotli is limited to
+application/json responses under COMPRESSION_BROTLI_PATH_PREFIXES; HTML
+pages such as the admin carry CSRF tokens and stay on GZipMiddleware,
+which pads them with random bytes against BREACH. Streamed responses are
+compressed chunk by chunk and flushed after each one, so the client still
+receives data as it is produced. Brotli needs the optional ``brotli``
+package; without it every client gets gzip.
+"""
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+re_accepts_brotli = _lazy_re_compile(r'\bbr\b')
+
+
+def compress_brotli(data, quality):
+    return brotli.compress(data, quality=quality)
+
+
+def compress_brotli_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_brotli_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    async for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZipMiddleware with a size threshold that prefers Brotli for API JSON when accepted"""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_length = getattr(settings, 'COMPRESSION_MIN_LENGTH', 1024)
+        self.brotli_quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4)
+        self.brotli_path_prefixes = tuple(getattr(settings, 'COMPRESSION_BROTLI_PATH_PREFIXES', ('/api/',)))
+
+    def accepts_brotli(self, request):
+        return brotli is not None and re_accepts_brotli.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+    def use_brotli(self, request, response):
+        return (
+            request.path_info.startswith(self.brotli_path_prefixes)
+            and response.get('Content-Type', '').startswith('application/json')
+            and self.accepts_brotli(request)
+        )
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < self.min_length:
+            return response
+        if response.has_header('Content-Encoding') or not self.use_brotli(request, response):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_brotli_sequence(
+                    response.streaming_content, self.brotli_quality
+                )
+            else:
+                response.streaming_content = compress_brotli_sequence(
+                    response.streaming_content, self.brotli_quality
+                )
+            del response.headers['Content-Length']
+        else:
+            compressed_content = compress_brotli(response.content, self.brotli_quality)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        # Compressed bytes differ from the identity representation (RFC 9110 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
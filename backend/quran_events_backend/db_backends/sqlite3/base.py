@@ -0,0 +1,60 @@
+"""
+SQLite backend that tunes every new connection for several gunicorn workers.
+
+Set ``ENGINE`` to ``quran_events_backend.db_backends.sqlite3`` and configure
+it through ``OPTIONS``:
+
+- ``pragmas``: PRAGMA name -> value applied on connect, merged over
+  DEFAULT_PRAGMAS (WAL journal, NORMAL sync, busy timeout, mmap, page cache).
+- ``transaction_mode``: ``'DEFERRED'`` (SQLite's default), ``'IMMEDIATE'``
+  or ``'EXCLUSIVE'``. IMMEDIATE takes the write lock when an atomic block
+  starts, so concurrent writers wait on busy_timeout instead of failing
+  with "database is locked" when a read lock cannot be upgraded.
+
+Remaining OPTIONS are passed to sqlite3.connect() as usual.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # milliseconds
+    'mmap_size': 134217728,  # 128 MiB
+    'cache_size': -20000,  # negative: KiB, ~20 MB per connection
+}
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        options = dict(self.settings_dict['OPTIONS'])
+        self.pragmas = {**DEFAULT_PRAGMAS, **(options.pop('pragmas', None) or {})}
+        transaction_mode = (options.pop('transaction_mode', None) or 'DEFERRED').upper()
+        if transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"Unsupported SQLite transaction_mode {transaction_mode!r}; "
+                f"use one of {', '.join(TRANSACTION_MODES)}."
+            )
+        self.transaction_mode = transaction_mode
+
+        # The parent reads OPTIONS straight into sqlite3.connect() kwargs
+        settings_dict = self.settings_dict
+        self.settings_dict = {**settings_dict, 'OPTIONS': options}
+        try:
+            return super().get_connection_params()
+        finally:
+            self.settings_dict = settings_dict
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            if not name.replace('_', '').isalnum():
+                raise ImproperlyConfigured(f'Invalid SQLite pragma name {name!r}')
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
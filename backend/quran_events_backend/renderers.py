@@ -0,0 +1,51 @@
+"""
+orjson-backed JSON rendering for DRF, with the stdlib renderer as fallback.
+
+Output matches rest_framework.renderers.JSONRenderer byte for byte for
+the compact, non-indented responses the API sends: dates, times and
+values orjson does not know go through DRF's own encoder, so datetimes
+still end in 'Z' and Decimals become floats. Indented output (the
+browsable API, ``; indent=`` in Accept) and installs without orjson use
+JSONRenderer.
+
+RawJSON response data is already-rendered JSON and is sent unchanged.
+"""
+import json
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class RawJSON(bytes):
+    """Already-rendered UTF-8 JSON, passed through by ORJSONRenderer as the response body"""
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer that serializes with orjson when it is installed"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, RawJSON):
+            if not self.get_indent(accepted_media_type, renderer_context or {}):
+                return bytes(data)
+            # The browsable API and ``; indent=`` want it pretty-printed
+            data = json.loads(data)
+        if orjson is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+        # Same escaping as JSONRenderer: these are valid JSON but not valid JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,211 @@
+"""
+Tag-invalidated response caching for DRF read endpoints.
+
+A cached entry stores the response data together with the version of
+every tag it depends on (``event:<id>``, ``events:list``, ``users`` ...).
+invalidate_tags() moves a tag to a new version, so every entry recorded
+against the old one stops matching on its next lookup. Versions live in
+the Django cache, so invalidation reaches every worker when CACHES points
+at a shared backend, and only the local process with locmem.
+
+Keys combine the route, the query string, the requester's role, page
+permissions and language, plus the user id on per-user views.
+
+Rebuilds are single-flight per key: concurrent misses wait for the one
+request building the entry and reuse it, and while an invalidated entry
+is being rebuilt other requests get the stale copy (X-Cache: STALE),
+except users pinned to the primary after a write of their own.
+"""
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from rest_framework.response import Response
+
+from accounts.permissions import get_request_pages, get_request_role
+
+from .routers import is_pinned_to_primary
+from .single_flight import single_flight
+
+KEY_PREFIX = 'respcache'
+STAT_KEYS = {
+    'hits': f'{KEY_PREFIX}:stats:hits',
+    'misses': f'{KEY_PREFIX}:stats:misses',
+    'stale': f'{KEY_PREFIX}:stats:stale',
+}
+
+
+def _tag_key(tag):
+    return f'{KEY_PREFIX}:tag:{tag}'
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def get_tag_versions(tags):
+    """Current version of each tag; tags never seen (or evicted) get a fresh one"""
+    keys = {_tag_key(tag): tag for tag in tags}
+    found = cache.get_many(list(keys))
+    versions = {keys[key]: version for key, version in found.items()}
+    missing = {_tag_key(tag): _new_version() for tag in tags if tag not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update({keys[key]: version for key, version in missing.items()})
+    return versions
+
+
+def _bump(tags):
+    cache.set_many({_tag_key(tag): _new_version() for tag in tags}, timeout=None)
+
+
+def invalidate_tags(*tags):
+    """Invalidate every cached response depending on any of tags.
+
+    Inside a transaction the tags are bumped again on commit, so an entry
+    rebuilt from pre-commit data in the meantime does not survive.
+    """
+    if not tags:
+        return
+    _bump(tags)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _bump(tags))
+
+
+def _count(stat):
+    key = STAT_KEYS[stat]
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_stats():
+    values = cache.get_many(list(STAT_KEYS.values()))
+    stats = {stat: values.get(key, 0) for stat, key in STAT_KEYS.items()}
+    lookups = stats['hits'] + stats['misses'] + stats['stale']
+    stats['hit_ratio'] = (stats['hits'] + stats['stale']) / lookups if lookups else 0.0
+    return stats
+
+
+def reset_stats():
+    cache.delete_many(list(STAT_KEYS.values()))
+
+
+def build_cache_key(request, per_user=False):
+    parts = [
+        request.path,
+        '&'.join(sorted(request.GET.urlencode().split('&'))),
+        str(get_request_role(request)),
+        str(int(get_request_pages(request))),
+        getattr(request, 'LANGUAGE_CODE', settings.LANGUAGE_CODE),
+    ]
+    if per_user:
+        parts.append(str(request.user.id))
+    digest = hashlib.sha1('|'.join(parts).encode()).hexdigest()
+    return f'{KEY_PREFIX}:entry:{digest}'
+
+
+def _cached_response(entry, state):
+    response = Response(entry['data'])
+    response['X-Cache'] = state
+    return response
+
+
+def _is_current(entry):
+    return entry is not None and get_tag_versions(entry['tags']) == entry['tags']
+
+
+def store_response(key, response, versions, timeout):
+    """Cache a 200 response under the tag versions read before it was built.
+
+    A write that lands while the response is being built bumps a tag past
+    those versions, so the entry is never served.
+    """
+    if response.status_code == 200:
+        cache.set(key, {'tags': versions, 'data': response.data}, timeout)
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def _timeout(timeout):
+    return timeout if timeout is not None else getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 60)
+
+
+def _user_id(request):
+    user = getattr(request, 'user', None)
+    return user.id if user is not None and user.is_authenticated else None
+
+
+def serve_cached(request, key, tags, build, timeout=None):
+    """Serve key from the cache, rebuilding it with build() at most once at a time"""
+    entry = cache.get(key)
+    if _is_current(entry):
+        _count('hits')
+        return _cached_response(entry, 'HIT')
+    serve_stale = entry is not None and not is_pinned_to_primary(_user_id(request))
+    with single_flight.acquire(key, blocking=not serve_stale) as acquired:
+        if not acquired and serve_stale:
+            _count('stale')
+            return _cached_response(entry, 'STALE')
+        if acquired:
+            # The request holding the lock before us may have rebuilt the entry
+            entry = cache.get(key)
+            if _is_current(entry):
+                _count('hits')
+                return _cached_response(entry, 'HIT')
+        _count('misses')
+        versions = get_tag_versions(tags)
+        return store_response(key, build(), versions, _timeout(timeout))
+
+
+class CachedResponseMixin:
+    """Cache GET responses of an APIView under dependency tags.
+
+    Set ``cache_tags`` (format strings over the URL kwargs, e.g.
+    ``'event:{pk}'``) or override get_cache_tags(). ``cache_per_user``
+    keys entries by user as well, for responses that depend on who asks.
+    Permission checks still run on every request before the cache is read,
+    and views defining get() themselves are cached too.
+    """
+    cache_tags = ()
+    cache_timeout = None
+    cache_per_user = False
+
+    def get_cache_tags(self):
+        return [tag.format(**self.kwargs) for tag in self.cache_tags]
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method == 'GET':
+            # Wrap the handler dispatch() calls next, whichever class defines get()
+            handler = self.get
+            self.get = lambda request, *args, **kwargs: serve_cached(
+                request,
+                build_cache_key(request, per_user=self.cache_per_user),
+                self.get_cache_tags(),
+                lambda: handler(request, *args, **kwargs),
+                self.cache_timeout,
+            )
+
+
+def cache_response(tags, timeout=None, per_user=False):
+    """Function-view counterpart of CachedResponseMixin; apply below @api_view"""
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view_func(request, *args, **kwargs)
+            return serve_cached(
+                request,
+                build_cache_key(request, per_user=per_user),
+                [tag.format(**kwargs) for tag in tags],
+                lambda: view_func(request, *args, **kwargs),
+                timeout,
+            )
+        return wrapper
+    return decorator
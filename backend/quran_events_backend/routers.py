@@ -0,0 +1,121 @@
+"""
+Read-replica routing for safe API requests.
+
+Reads go to the replica only while a view has opted in: ReplicaReadMixin
+(class-based views) and replica_reads (function views) route the ORM
+reads of safe requests to READ_REPLICA_ALIAS. Writes always go to the
+primary. A user who just wrote is pinned to the primary for
+REPLICA_PIN_SECONDS so they read their own writes despite replication lag.
+Without a replica alias in DATABASES everything stays on 'default'.
+"""
+import contextvars
+import functools
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+_read_alias = contextvars.ContextVar('read_alias', default=None)
+
+
+def get_replica_alias():
+    """Configured replica alias, or None when no replica database is set up"""
+    alias = getattr(settings, 'READ_REPLICA_ALIAS', 'replica')
+    return alias if alias in connections.settings else None
+
+
+def _pin_key(user_id):
+    return f'replica:pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """Serve this user's reads from the primary for the next REPLICA_PIN_SECONDS"""
+    cache.set(_pin_key(user_id), True, getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+
+
+def is_pinned_to_primary(user_id):
+    return user_id is not None and cache.get(_pin_key(user_id)) is not None
+
+
+@contextmanager
+def read_from(alias):
+    """Route ORM reads inside the block to alias"""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def _request_user_id(request):
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    return user.id
+
+
+def replica_alias_for(request):
+    """Alias safe requests should read from, or None to stay on the primary"""
+    if request.method not in SAFE_METHODS:
+        return None
+    alias = get_replica_alias()
+    if alias is None or is_pinned_to_primary(_request_user_id(request)):
+        return None
+    return alias
+
+
+def record_write(request, response):
+    """Pin the user to the primary after a successful write"""
+    if request.method in SAFE_METHODS or response.status_code >= 400:
+        return
+    user_id = _request_user_id(request)
+    if user_id is not None and get_replica_alias() is not None:
+        pin_to_primary(user_id)
+
+
+class ReplicaRouter:
+    """Send reads to the alias selected for the current request, writes to the primary"""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data as the primary
+        return True
+
+
+class ReplicaReadMixin:
+    """APIView mixin serving safe requests from the read replica"""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        alias = replica_alias_for(request)
+        self._replica_token = _read_alias.set(alias) if alias else None
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _read_alias.reset(token)
+            self._replica_token = None
+        record_write(request, response)
+        return response
+
+
+def replica_reads(view_func):
+    """Function-view counterpart of ReplicaReadMixin; apply below @api_view"""
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        alias = replica_alias_for(request)
+        if alias is not None:
+            with read_from(alias):
+                return view_func(request, *args, **kwargs)
+        response = view_func(request, *args, **kwargs)
+        record_write(request, response)
+        return response
+    return wrapper
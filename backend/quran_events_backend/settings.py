@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -40,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'accounts',
     'events',
@@ -48,7 +50,9 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',  # /static/ without nginx, precompressed
+    'quran_events_backend.compression.CompressionMiddleware',  # gzip / Brotli above COMPRESSION_MIN_LENGTH
+    'accounts.middleware.ApiSessionMiddleware',  # No session store for /api/
     'django.middleware.locale.LocaleMiddleware',  # Add this for language support
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -82,11 +86,29 @@ WSGI_APPLICATION = 'quran_events_backend.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # SQLite tuned for concurrent workers (see quran_events_backend/db_backends/sqlite3/base.py)
+        'ENGINE': 'quran_events_backend.db_backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'transaction_mode': os.environ.get('SQLITE_TRANSACTION_MODE', 'IMMEDIATE'),
+            'pragmas': {
+                'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+                'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+                'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),  # milliseconds
+                'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 134217728)),  # bytes
+                'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -20000)),  # negative: KiB
+            },
+        },
     }
 }
 
+# Read replica (see quran_events_backend/routers.py): safe requests on opted-in
+# views read from READ_REPLICA_ALIAS when that alias is in DATABASES; users who
+# just wrote are pinned to the primary for REPLICA_PIN_SECONDS
+DATABASE_ROUTERS = ['quran_events_backend.routers.ReplicaRouter']
+READ_REPLICA_ALIAS = 'replica'
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -129,6 +151,10 @@ LOCALE_PATHS = [
     BASE_DIR / 'locale',
 ]
 
+# Paths served without loading or saving sessions (see accounts.middleware);
+# the language comes from the user's preference, the language cookie or Accept-Language
+SESSIONLESS_PATH_PREFIXES = ('/api/',)
+
 
 
 # Static files (CSS, JavaScript, Images)
@@ -144,22 +170,90 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson when installed, the stdlib json module otherwise (see quran_events_backend.renderers)
+    'DEFAULT_RENDERER_CLASSES': [
+        'quran_events_backend.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'quran_events_backend.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 }
 
+# Caches: per-process local memory by default, which is only right for a
+# single process (runserver, tests). Set CACHE_BACKEND=redis (with REDIS_URL)
+# or CACHE_BACKEND=file (with CACHE_LOCATION) to share the cache, and with it
+# response cache invalidation, replica pins and token versions, across
+# gunicorn workers; settings_production requires one of them
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        }
+    }
+elif CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', '/var/tmp/ayat_cache'),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'ayat',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+# Seconds a cached API response may be served (see quran_events_backend.response_cache)
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 60))
+
+# Response compression (see quran_events_backend.compression): smallest body
+# worth compressing, and the Brotli level used when the brotli package is installed
+COMPRESSION_MIN_LENGTH = int(os.environ.get('COMPRESSION_MIN_LENGTH', 1024))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))
+# Brotli only for application/json under these paths; everything else gets gzip
+COMPRESSION_BROTLI_PATH_PREFIXES = ('/api/',)
+
+# Single-flight recomputation (see quran_events_backend.single_flight): lock
+# files shared by the workers of a host, and how long a request waits for
+# another one's result before computing it itself
+SINGLE_FLIGHT_LOCK_DIR = os.environ.get('SINGLE_FLIGHT_LOCK_DIR', '/var/tmp/ayat_locks')
+SINGLE_FLIGHT_TIMEOUT = float(os.environ.get('SINGLE_FLIGHT_TIMEOUT', 10))
+
+# Per-process cache of authenticated users (see accounts.authentication)
+AUTH_USER_CACHE = {
+    'MAX_SIZE': 1024,
+    'TTL': 60,  # seconds
+}
+
+# Seconds a cached /auth/check/ and /profile/ payload is kept (see accounts.payload_cache)
+USER_PAYLOAD_CACHE_TIMEOUT = 300
+
+# How often (seconds) each worker pulls newly blacklisted refresh tokens
+REVOKED_TOKENS_SYNC_INTERVAL = 2
+
 # JWT Configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    'UPDATE_LAST_LOGIN': False,  # written behind by accounts.last_login
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'VERIFYING_KEY': None,
@@ -179,6 +273,8 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.jwt_serializers.CustomTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.jwt_serializers.CustomTokenRefreshSerializer',
 }
 
 # CORS Configuration
@@ -220,9 +316,33 @@ CORS_ALLOW_METHODS = [
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
+# Load the profile together with the user on login
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.ProfileModelBackend',
+]
+
+# Seconds between batched last_login writes (see accounts.last_login)
+LAST_LOGIN_FLUSH_INTERVAL = 60
+
+# Largest file /api/users/import/ accepts. Hashing runs inside the request and
+# must finish within gunicorn's --timeout (120s); bigger files go through
+# `manage.py import_users`
+USER_IMPORT_MAX_ROWS = int(os.environ.get('USER_IMPORT_MAX_ROWS', 200))
+
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# collectstatic writes gzip and Brotli copies of each file next to it;
+# settings_production adds content-hashed names (the manifest storage needs
+# collectstatic to have run before any template using {% static %} renders)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedStaticFilesStorage',
+    },
+}
 
 # Media files
 MEDIA_URL = '/media/'
@@ -6,6 +6,8 @@ import os
 from pathlib import Path
 from datetime import timedelta
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -32,6 +34,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'accounts',
     'events',
@@ -40,7 +43,9 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',  # /static/ without nginx, precompressed
+    'quran_events_backend.compression.CompressionMiddleware',  # gzip / Brotli above COMPRESSION_MIN_LENGTH
+    'accounts.middleware.ApiSessionMiddleware',  # No session store for /api/
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -69,12 +74,68 @@ TEMPLATES = [
 WSGI_APPLICATION = 'quran_events_backend.wsgi.application'
 
 # Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DATABASE_ENGINE selects the profile: 'sqlite' (default) or 'postgresql'
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DATABASE_NAME', 'ayat'),
+            'USER': os.environ.get('DATABASE_USER', 'ayat'),
+            'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+            'HOST': os.environ.get('DATABASE_HOST', '127.0.0.1'),
+            'PORT': os.environ.get('DATABASE_PORT', '5432'),
+            # Keep connections open between requests instead of reconnecting every time
+            'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            # Required when connecting through pgbouncer in transaction pooling mode
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DATABASE_POOLER', '') == 'pgbouncer',
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('DATABASE_CONNECT_TIMEOUT', 5)),
+            },
+        }
     }
-}
+    if os.environ.get('DATABASE_REPLICA_HOST'):
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'HOST': os.environ['DATABASE_REPLICA_HOST'],
+            'PORT': os.environ.get('DATABASE_REPLICA_PORT', DATABASES['default']['PORT']),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            # SQLite tuned for concurrent workers (see quran_events_backend/db_backends/sqlite3/base.py)
+            'ENGINE': 'quran_events_backend.db_backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'transaction_mode': os.environ.get('SQLITE_TRANSACTION_MODE', 'IMMEDIATE'),
+                'pragmas': {
+                    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+                    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+                    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),  # milliseconds
+                    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 134217728)),  # bytes
+                    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -20000)),  # negative: KiB
+                },
+            },
+        }
+    }
+    if os.environ.get('SQLITE_REPLICA_PATH'):
+        # e.g. a Litestream/LiteFS read replica of db.sqlite3
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'NAME': os.environ['SQLITE_REPLICA_PATH'],
+            'TEST': {'MIRROR': 'default'},
+        }
+
+# Read replica (see quran_events_backend/routers.py): safe requests on opted-in
+# views read from READ_REPLICA_ALIAS when that alias is in DATABASES; users who
+# just wrote are pinned to the primary for REPLICA_PIN_SECONDS
+DATABASE_ROUTERS = ['quran_events_backend.routers.ReplicaRouter']
+READ_REPLICA_ALIAS = 'replica'
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -109,9 +170,23 @@ LOCALE_PATHS = [
     BASE_DIR / 'locale',
 ]
 
+# Paths served without loading or saving sessions (see accounts.middleware);
+# the language comes from the user's preference, the language cookie or Accept-Language
+SESSIONLESS_PATH_PREFIXES = ('/api/',)
+
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# collectstatic writes gzip and Brotli copies of each file next to it and
+# content-hashed names, which WhiteNoise serves as immutable
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 
 # Media files
 MEDIA_URL = '/media/'
@@ -123,22 +198,86 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson when installed, the stdlib json module otherwise (see quran_events_backend.renderers)
+    'DEFAULT_RENDERER_CLASSES': [
+        'quran_events_backend.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'quran_events_backend.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 }
 
+# Caches: shared by every gunicorn worker, since response cache tag versions,
+# EventStats versions, replica pins, token versions and user payloads all
+# live here. File-based by default (CACHE_LOCATION); set CACHE_BACKEND=redis
+# with REDIS_URL to use Redis. A per-process locmem cache would let the other
+# workers serve stale data and skip token revocations, so it is refused.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'file')
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        }
+    }
+elif CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', '/var/tmp/ayat_cache'),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+else:
+    raise ImproperlyConfigured(
+        f'CACHE_BACKEND={CACHE_BACKEND!r} is not shared between gunicorn workers; use "file" or "redis"'
+    )
+
+# Seconds a cached API response may be served (see quran_events_backend.response_cache)
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 60))
+
+# Response compression (see quran_events_backend.compression): smallest body
+# worth compressing, and the Brotli level used when the brotli package is installed
+COMPRESSION_MIN_LENGTH = int(os.environ.get('COMPRESSION_MIN_LENGTH', 1024))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))
+# Brotli only for application/json under these paths; everything else gets gzip
+COMPRESSION_BROTLI_PATH_PREFIXES = ('/api/',)
+
+# Single-flight recomputation (see quran_events_backend.single_flight): lock
+# files shared by the workers of a host, and how long a request waits for
+# another one's result before computing it itself
+SINGLE_FLIGHT_LOCK_DIR = os.environ.get('SINGLE_FLIGHT_LOCK_DIR', '/var/tmp/ayat_locks')
+SINGLE_FLIGHT_TIMEOUT = float(os.environ.get('SINGLE_FLIGHT_TIMEOUT', 10))
+
+# Per-process cache of authenticated users (see accounts.authentication)
+AUTH_USER_CACHE = {
+    'MAX_SIZE': 1024,
+    'TTL': 60,  # seconds
+}
+
+# Seconds a cached /auth/check/ and /profile/ payload is kept (see accounts.payload_cache)
+USER_PAYLOAD_CACHE_TIMEOUT = 300
+
+# How often (seconds) each worker pulls newly blacklisted refresh tokens
+REVOKED_TOKENS_SYNC_INTERVAL = 2
+
 # JWT Configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    'UPDATE_LAST_LOGIN': False,  # written behind by accounts.last_login
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'VERIFYING_KEY': None,
@@ -158,6 +297,8 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.jwt_serializers.CustomTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.jwt_serializers.CustomTokenRefreshSerializer',
 }
 
 # CORS Configuration for production
@@ -193,6 +334,19 @@ CORS_ALLOW_METHODS = [
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
+# Load the profile together with the user on login
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.ProfileModelBackend',
+]
+
+# Seconds between batched last_login writes (see accounts.last_login)
+LAST_LOGIN_FLUSH_INTERVAL = 60
+
+# Largest file /api/users/import/ accepts. Hashing runs inside the request and
+# must finish within gunicorn's --timeout (120s); bigger files go through
+# `manage.py import_users`
+USER_IMPORT_MAX_ROWS = int(os.environ.get('USER_IMPORT_MAX_ROWS', 200))
+
 # Security settings
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
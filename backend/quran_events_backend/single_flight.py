@@ -0,0 +1,125 @@
+"""
+Single-flight locking: at most one computation per key at a time.
+
+A per-key threading lock coalesces requests within a worker, and an
+flock()ed file per key coalesces gunicorn workers on the same host. The
+holder unlinks the file before unlocking it, so only keys being computed
+right now have a file in the lock directory.
+Callers either wait for the running computation and then reuse its
+result (blocking=True), or skip the wait and serve what they already
+have (blocking=False, stale-while-revalidate).
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to per-process locking only
+    fcntl = None
+
+
+class SingleFlight:
+    """Per-key lock held across threads of a worker and across workers"""
+
+    poll_interval = 0.01
+
+    def __init__(self, lock_dir=None, timeout=10):
+        self.lock_dir = lock_dir or os.path.join(tempfile.gettempdir(), 'ayat-single-flight')
+        self.timeout = timeout
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _checkout(self, key):
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+            return entry[0]
+
+    def _checkin(self, key):
+        with self._guard:
+            entry = self._locks[key]
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    def _lock_path(self, key):
+        return os.path.join(self.lock_dir, hashlib.sha1(key.encode()).hexdigest() + '.lock')
+
+    @staticmethod
+    def _is_linked(fd, path):
+        """Whether fd is still the file at path, not one its previous holder unlinked"""
+        try:
+            return os.stat(path).st_ino == os.fstat(fd).st_ino
+        except FileNotFoundError:
+            return False
+
+    def _acquire_file(self, key, deadline):
+        """Open and flock the key's lock file; returns the fd or None when it is busy"""
+        if fcntl is None:
+            return -1
+        os.makedirs(self.lock_dir, exist_ok=True)
+        path = self._lock_path(key)
+        while True:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if deadline is None or time.monotonic() >= deadline:
+                        os.close(fd)
+                        return None
+                    time.sleep(self.poll_interval)
+            if self._is_linked(fd, path):
+                return fd
+            # Locked a file the previous holder already unlinked; lock the current one
+            os.close(fd)
+
+    def _release_file(self, key, fd):
+        if fd >= 0:
+            try:
+                os.unlink(self._lock_path(key))
+            except FileNotFoundError:
+                pass
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    @contextmanager
+    def acquire(self, key, blocking=True, timeout=None):
+        """Hold the key's lock for the block; yields whether it was acquired.
+
+        Non-blocking callers get False at once if a computation is running.
+        Blocking callers wait up to timeout seconds, then get False too.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout if blocking else None
+        lock = self._checkout(key)
+        try:
+            if not lock.acquire(blocking, timeout if blocking else -1):
+                yield False
+                return
+            try:
+                fd = self._acquire_file(key, deadline)
+                if fd is None:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    self._release_file(key, fd)
+            finally:
+                lock.release()
+        finally:
+            self._checkin(key)
+
+
+single_flight = SingleFlight(
+    lock_dir=getattr(settings, 'SINGLE_FLIGHT_LOCK_DIR', None),
+    timeout=getattr(settings, 'SINGLE_FLIGHT_TIMEOUT', 10),
+)
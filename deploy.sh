@@ -122,6 +122,10 @@ pip install django-environ==0.11.2
 echo -e "${YELLOW}🗄️ Running Django migrations...${NC}"
 python manage.py migrate --settings=quran_events_backend.settings_production
 
+# Re-render stored event documents (serializer output may have changed)
+echo -e "${YELLOW}📄 Rebuilding event documents...${NC}"
+python manage.py rebuild_event_documents --settings=quran_events_backend.settings_production
+
 # Collect static files
 echo -e "${YELLOW}📁 Collecting static files...${NC}"
 python manage.py collectstatic --noinput --settings=quran_events_backend.settings_production
@@ -178,7 +182,7 @@ server {
     gzip_vary on;
     gzip_min_length 1024;
     gzip_proxied expired no-cache no-store private auth;
-    gzip_types text/plain text/css text/xml text/javascript application/x-javascript application/xml+rss application/javascript;
+    gzip_types text/plain text/css text/xml text/javascript application/x-javascript application/xml+rss application/javascript application/json;
     
     # Client Max Body Size
     client_max_body_size 20M;
@@ -188,6 +192,8 @@ server {
         alias /home/ubuntu/projects/ayat-management-system/ayat-management/backend/staticfiles/;
         expires 1y;
         add_header Cache-Control "public, immutable";
+        # .gz copies written by collectstatic (WhiteNoise storage)
+        gzip_static on;
     }
     
     # Media files for Django
@@ -249,10 +255,19 @@ RestartSec=3
 WantedBy=multi-user.target
 EOF
 
+# Nightly jobs: mark past events as completed, purge expired refresh tokens
+echo -e "${YELLOW}⏰ Installing maintenance timers...${NC}"
+cp $PROJECT_DIR/ayat-complete-events.service /etc/systemd/system/
+cp $PROJECT_DIR/ayat-complete-events.timer /etc/systemd/system/
+cp $PROJECT_DIR/ayat-purge-tokens.service /etc/systemd/system/
+cp $PROJECT_DIR/ayat-purge-tokens.timer /etc/systemd/system/
+
 # Enable and start services
 systemctl daemon-reload
 systemctl enable ayat-backend
 systemctl start ayat-backend
+systemctl enable --now ayat-complete-events.timer
+systemctl enable --now ayat-purge-tokens.timer
 
 # Set proper permissions
 echo -e "${YELLOW}🔐 Setting permissions...${NC}"
@@ -26,7 +26,7 @@ server {
     gzip_vary on;
     gzip_min_length 1024;
     gzip_proxied expired no-cache no-store private auth;
-    gzip_types text/plain text/css text/xml text/javascript application/x-javascript application/xml+rss application/javascript;
+    gzip_types text/plain text/css text/xml text/javascript application/x-javascript application/xml+rss application/javascript application/json;
     
     # Client Max Body Size
     client_max_body_size 20M;
@@ -36,6 +36,8 @@ server {
         alias /home/ubuntu/projects/ayat-management-system/ayat-management/backend/staticfiles/;
         expires 1y;
         add_header Cache-Control "public, immutable";
+        # .gz copies written by collectstatic (WhiteNoise storage)
+        gzip_static on;
     }
     
     # Media files for Django